@@ -1,3 +1,6 @@
+import logging
+
+from analysis.base import BaseAnalyzer, BasePreprocessor
 from analysis.core_analysis import (
     BloodChargeCapAnalyzer,
     BuffTracker,
@@ -14,7 +17,80 @@ from analysis.frost_analysis import (
 )
 from analysis.items import ItemPreprocessor, TrinketPreprocessor
 from analysis.unholy_analysis import FesteringStrikeTracker, UnholyAnalysisConfig
-from report import Fight, Report
+from event_columns import EventColumns
+from report import (
+    ABILITY_CODES,
+    APPLYBUFF,
+    APPLYDEBUFF,
+    BLOOD_PLAGUE,
+    BLOOD_TAP,
+    CAST,
+    EVENT_TYPE_CODES,
+    FROST_FEVER,
+    FROST_STRIKE,
+    HOWLING_BLAST,
+    KILLING_MACHINE,
+    MELEE,
+    REFRESHDEBUFF,
+    REMOVEBUFF,
+    REMOVEDEBUFF,
+    SUMMON_GARGOYLE,
+    EventFilter,
+    Fight,
+    Report,
+)
+
+SPEED = ABILITY_CODES.code("Speed")
+UNHOLY_FRENZY = ABILITY_CODES.code("Unholy Frenzy")
+UNBREAKABLE_ARMOR = ABILITY_CODES.code("Unbreakable Armor")
+DOMINION = ABILITY_CODES.code("Dominion")
+MAGMA = ABILITY_CODES.code("Magma")
+
+
+class EventRouter:
+    """
+    Routes each event to only the analyzers subscribed to it, see
+    BaseAnalyzer.EVENT_TYPES. The analyzers for an event only depend on its type,
+    ability and who's involved, so they're worked out once per combination
+    """
+
+    def __init__(self, analyzers, source_id):
+        self._source_id = source_id
+        self._subscriptions = [
+            (
+                analyzer,
+                self._codes(EVENT_TYPE_CODES, analyzer.EVENT_TYPES),
+                self._codes(ABILITY_CODES, analyzer.ABILITIES),
+            )
+            for analyzer in analyzers
+            # Analyzers that don't handle events aren't subscribed to anything
+            if type(analyzer).add_event is not BaseAnalyzer.add_event
+        ]
+        self._routes = {}
+
+    @staticmethod
+    def _codes(name_codes, names):
+        return None if names is None else name_codes.codes(names)
+
+    def get_analyzers(self, event):
+        is_source = (
+            event.sourceID == self._source_id or event.targetID == self._source_id
+        )
+        is_pet = not is_source and (
+            event.is_owner_pet_source or event.is_owner_pet_target
+        )
+        key = (event.type_code, event.ability_code, is_source, is_pet)
+
+        analyzers = self._routes.get(key)
+        if analyzers is None:
+            analyzers = self._routes[key] = [
+                analyzer
+                for analyzer, event_types, abilities in self._subscriptions
+                if (is_source or (is_pet and analyzer.INCLUDE_PET_EVENTS))
+                and (event_types is None or event.type_code in event_types)
+                and (abilities is None or event.ability_code in abilities)
+            ]
+        return analyzers
 
 
 class Analyzer:
@@ -35,39 +111,40 @@ class Analyzer:
         self._buff_tracker = None
         self.runes = None
         self._analyzers = []  # Store analyzers to access their results later
+        self._num_passes = 0
+
+    def _get_preprocessors(self):
+        """:return: the preprocessors, in the order they decorate events"""
+        return [
+            self._get_dead_zone_analyzer(),
+            self._get_buff_tracker(),
+            self._get_debuff_tracker(),
+            self._get_talent_preprocessor(),
+            self._get_item_preprocessor(),
+            PetNameDetector(),
+            PrepullArmyOfTheDeadTracker(self.runes),
+        ]
+
+    def _preprocess_events(self, preprocessors):
+        """
+        Runs the first pass for the preprocessors that need to see every event before
+        decorating them, skipped if none of them do
+        """
+        preprocessors = [
+            preprocessor
+            for preprocessor in preprocessors
+            if preprocessor.REQUIRES_FIRST_PASS
+        ]
+        if not preprocessors:
+            return
 
-    def _preprocess_events(self):
-        dead_zone_analyzer = self._get_dead_zone_analyzer()
-        talent_preprocessor = self._get_talent_preprocessor()
-        buff_tracker = self._get_buff_tracker()
-        debuff_tracker = self._get_debuff_tracker()
         source_id = self._fight.source.id
-        pet_analyzer = PetNameDetector()
-        items = self._get_item_preprocessor()
-        aotd = PrepullArmyOfTheDeadTracker(self.runes)
-
-        for event in self._events:
-            if event["sourceID"] == source_id or event["targetID"] == source_id:
-                dead_zone_analyzer.preprocess_event(event)
-                talent_preprocessor.preprocess_event(event)
-                buff_tracker.preprocess_event(event)
-                debuff_tracker.preprocess_event(event)
-                items.preprocess_event(event)
-
-            # Pet analyzers
-            pet_analyzer.preprocess_event(event)
-            aotd.preprocess_event(event)
-
         for event in self._events:
-            dead_zone_analyzer.decorate_event(event)
-            buff_tracker.decorate_event(event)
-            debuff_tracker.decorate_event(event)
-            talent_preprocessor.decorate_event(event)
-            items.decorate_event(event)
-            pet_analyzer.decorate_event(event)
-            aotd.decorate_event(event)
-
-        return dead_zone_analyzer
+            is_source = event.sourceID == source_id or event.targetID == source_id
+            for preprocessor in preprocessors:
+                if is_source or preprocessor.INCLUDE_PET_EVENTS:
+                    preprocessor.preprocess_event(event)
+        self._num_passes += 1
 
     def _get_dead_zone_analyzer(self):
         if not hasattr(self, "_dead_zone_analyzer"):
@@ -153,14 +230,14 @@ class Analyzer:
 
             def detect():
                 for event in self._events:
-                    if event["type"] == "cast" and event["ability"] in (
-                        "Howling Blast",
-                        "Frost Strike",
+                    if event.type_code == CAST and event.ability_code in (
+                        HOWLING_BLAST,
+                        FROST_STRIKE,
                     ):
                         return "Frost"
-                    if event["type"] == "cast" and event["ability"] in (
-                        "Summon Gargoyle",
-                        "Unholy Frenzy",
+                    if event.type_code == CAST and event.ability_code in (
+                        SUMMON_GARGOYLE,
+                        UNHOLY_FRENZY,
                     ):
                         return "Unholy"
 
@@ -170,32 +247,14 @@ class Analyzer:
         return self.__spec
 
     def _filter_events(self):
-        """Remove any events we don't care to analyze or show"""
-        events = []
-
-        for _i, event in enumerate(self._fight.events):
-            # We're neither the source nor the target
-            if (
-                event["sourceID"] != self._fight.source.id
-                and event["targetID"] != self._fight.source.id
-                and event["sourceID"] not in self._fight.source.pets
-                and event["targetID"] not in self._fight.source.pets
-            ):
-                continue
-
-            # Don't really care about these
-            if event["type"] in ("applydebuffstack",):
-                continue
-
-            if (
-                event["type"] in ("refreshbuff", "applybuff", "removebuff")
-                and event["targetID"] != self._fight.source.id
-                and event["targetID"] not in self._fight.source.pets
-            ):
-                continue
-
-            events.append(event)
-        return events
+        """
+        Remove any events we don't care to analyze or show. The rest are copied, the
+        analysis decorates them and the fight's events are shared between analyses
+        """
+        event_filter = EventFilter(self._fight.source)
+        return [
+            event.copy() for event in self._fight.events if event_filter.matches(event)
+        ]
 
     @property
     def displayable_events(self):
@@ -204,32 +263,28 @@ class Analyzer:
 
         # First add the regular events
         for event in self._events:
-            if event["sourceID"] == self._fight.source.id and (
-                (event["type"] == "cast" and event["ability"] not in ("Speed", "Melee"))
+            if event.sourceID == self._fight.source.id and (
+                (event.type_code == CAST and event.ability_code not in (SPEED, MELEE))
                 or (
-                    event["type"] == "applybuff"
-                    and event["ability"] == "Killing Machine"
+                    event.type_code == APPLYBUFF
+                    and event.ability_code == KILLING_MACHINE
                 )
                 or (
-                    event["type"] == "removebuff"
-                    and event["ability"] in ("Unbreakable Armor", "Blood Tap")
+                    event.type_code == REMOVEBUFF
+                    and event.ability_code in (UNBREAKABLE_ARMOR, BLOOD_TAP)
                 )
                 or (
-                    event["type"] == "removedebuff"
-                    and event["ability"] in ("Blood Plague", "Frost Fever")
+                    event.type_code == REMOVEDEBUFF
+                    and event.ability_code in (BLOOD_PLAGUE, FROST_FEVER)
                     and (
                         self._fight.encounter.name != "Thaddius"
-                        or not event["in_dead_zone"]
+                        or not event.in_dead_zone
                     )
-                    and event["target_is_boss"]
+                    and event.target_is_boss
                 )
                 or (
-                    event["type"] in ("removedebuff", "applydebuff", "refreshdebuff")
-                    and event["ability"]
-                    in (
-                        "Dominion",
-                        "Magma",
-                    )
+                    event.type_code in (REMOVEDEBUFF, APPLYDEBUFF, REFRESHDEBUFF)
+                    and event.ability_code in (DOMINION, MAGMA)
                 )
             ):
                 events.append(event)
@@ -310,7 +365,8 @@ class Analyzer:
         self.runes = self._analysis_config.create_rune_tracker()
         rune_haste_tracker = self._create_rune_haste_tracker(self.runes)
 
-        self._preprocess_events()
+        preprocessors = self._get_preprocessors()
+        self._preprocess_events(preprocessors)
 
         buff_tracker = self._get_buff_tracker()
         analyzers = [rune_haste_tracker, self.runes, buff_tracker]
@@ -326,15 +382,54 @@ class Analyzer:
         self._analyzers = analyzers  # Store for access in displayable_events
 
         source_id = self._fight.source.id
+        columnar_analyzers = [
+            analyzer
+            for analyzer in analyzers
+            if analyzer.COLUMNAR and not analyzer.INCLUDE_PET_EVENTS
+        ]
+        router = EventRouter(
+            [analyzer for analyzer in analyzers if analyzer not in columnar_analyzers],
+            source_id,
+        )
+        streaming_preprocessors = [
+            preprocessor
+            for preprocessor in preprocessors
+            if not preprocessor.REQUIRES_FIRST_PASS
+        ]
+        decorators = [
+            preprocessor
+            for preprocessor in preprocessors
+            if type(preprocessor).decorate_event is not BasePreprocessor.decorate_event
+        ]
+
+        # Streaming preprocessing, decoration and analysis share a single pass
         for event in self._events:
-            for analyzer in analyzers:
-                if (
-                    event["sourceID"] == source_id or event["targetID"] == source_id
-                ) or (
-                    analyzer.INCLUDE_PET_EVENTS
-                    and (event["is_owner_pet_source"] or event["is_owner_pet_target"])
-                ):
-                    analyzer.add_event(event)
+            if streaming_preprocessors:
+                is_source = event.sourceID == source_id or event.targetID == source_id
+                for preprocessor in streaming_preprocessors:
+                    if is_source or preprocessor.INCLUDE_PET_EVENTS:
+                        preprocessor.preprocess_event(event)
+            for preprocessor in decorators:
+                preprocessor.decorate_event(event)
+            for analyzer in router.get_analyzers(event):
+                analyzer.add_event(event)
+        self._num_passes += 1
+
+        # Columns are built from decorated events
+        if columnar_analyzers:
+            columns = EventColumns(
+                event
+                for event in self._events
+                if event.sourceID == source_id or event.targetID == source_id
+            )
+            for analyzer in columnar_analyzers:
+                analyzer.add_columns(columns)
+            self._num_passes += 1
+
+        logging.info(
+            f"Analyzed {self._fight.encounter.name} in {self._num_passes} passes "
+            f"over {len(self._events)} events"
+        )
 
         displayable_events = self.displayable_events
         has_rune_error = any(event.get("rune_spend_error") for event in self._events)
@@ -346,7 +441,7 @@ class Analyzer:
             "num_rune_adjustments": num_rune_adjustments,
         }
 
-        for analyzer in analyzers:
+        for analyzer in self._analyzers:
             analysis.update(**analyzer.report())
 
         return {
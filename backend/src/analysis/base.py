@@ -1,3 +1,6 @@
+import math
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 from typing import TypeVar
 
 R = TypeVar("R")
@@ -9,10 +12,21 @@ def range_overlap(a, b):
 
 class BaseAnalyzer:
     INCLUDE_PET_EVENTS = False
+    # Subscriptions, events are only passed to add_event if their type is in
+    # EVENT_TYPES and their ability is in ABILITIES. None subscribes to all of them
+    EVENT_TYPES = None
+    ABILITIES = None
+    # Columnar analyzers get all of the source's events at once through add_columns,
+    # after the analysis pass, instead of add_event. Their add_event is the reference
+    # implementation add_columns is checked against, see tools/check_columns.py
+    COLUMNAR = False
 
     def add_event(self, event):
         pass
 
+    def add_columns(self, columns):
+        raise NotImplementedError
+
     def print(self):
         pass
 
@@ -25,6 +39,11 @@ class BaseAnalyzer:
 
 class BasePreprocessor:
     INCLUDE_PET_EVENTS = False
+    # Preprocessors that need to have seen every event before they can decorate any
+    # of them, e.g. to know when a window ends, get a pass of their own before the
+    # analysis. The others preprocess and decorate each event during the analysis
+    # pass
+    REQUIRES_FIRST_PASS = True
 
     def preprocess_event(self, event):
         raise NotImplementedError
@@ -133,13 +152,130 @@ class Window:
         return f"<Window start={self.start} end={self.end}>"
 
 
+class IntervalSet:
+    """
+    Windows ordered by start, with bisect lookups. Windows may touch but shouldn't
+    overlap, so their ends are in order too. Only the last one may be open ended
+    """
+
+    def __init__(self, windows=()):
+        self._windows = []
+        self._starts = []
+        # Open windows end at infinity
+        self._ends = []
+        # Durations summed up to each window, built on demand
+        self._cumulative_durations = None
+
+        for window in windows:
+            self.add(window)
+
+    def add(self, window):
+        index = bisect_right(self._starts, window.start)
+        self._windows.insert(index, window)
+        self._starts.insert(index, window.start)
+        self._ends.insert(index, math.inf if window.end is None else window.end)
+        self._cumulative_durations = None
+
+    def pop(self):
+        self._starts.pop()
+        self._ends.pop()
+        self._cumulative_durations = None
+        return self._windows.pop()
+
+    def end_last(self, end):
+        """Replaces the last window with one ending at end"""
+        self._windows[-1] = Window(self._windows[-1].start, end)
+        self._ends[-1] = end
+        self._cumulative_durations = None
+
+    def __len__(self):
+        return len(self._windows)
+
+    def __iter__(self):
+        return iter(self._windows)
+
+    def __getitem__(self, index):
+        return self._windows[index]
+
+    def __repr__(self):
+        return f"IntervalSet({self._windows})"
+
+    def latest_started(self, timestamp):
+        """:return: the last window starting at or before timestamp"""
+        index = bisect_right(self._starts, timestamp) - 1
+        return self._windows[index] if index >= 0 else None
+
+    def containing(self, timestamp):
+        """:return: the first window containing timestamp"""
+        index = bisect_right(self._starts, timestamp) - 1
+        if index < 0 or self._ends[index] < timestamp:
+            return None
+
+        # Windows touching at timestamp all contain it
+        while index > 0 and self._ends[index - 1] >= timestamp:
+            index -= 1
+        return self._windows[index]
+
+    def contains(self, timestamp):
+        return self.containing(timestamp) is not None
+
+    def overlaps(self, start, end):
+        """:return: whether any window overlaps start to end, inclusive"""
+        index = bisect_right(self._starts, end) - 1
+        return index >= 0 and self._ends[index] >= start
+
+    def clipped_length(self, start, end):
+        """:return: the total duration of the windows clipped to start to end"""
+        first = bisect_left(self._ends, start)
+        last = bisect_right(self._starts, end) - 1
+        if first > last:
+            return 0
+
+        length = self._clipped_duration(first, start, end)
+        if first == last:
+            return length
+
+        # Windows in between are inside start to end, and closed
+        if self._cumulative_durations is None:
+            self._cumulative_durations = list(
+                accumulate(
+                    (window.duration or 0 for window in self._windows),
+                    initial=0,
+                )
+            )
+        cumulative = self._cumulative_durations
+        length += cumulative[last] - cumulative[first + 1]
+        return length + self._clipped_duration(last, start, end)
+
+    def difference(self, other):
+        """:return: IntervalSet of the time in these windows that isn't in other's"""
+        difference = IntervalSet()
+
+        for window_start, window_end in zip(self._starts, self._ends, strict=True):
+            start = window_start
+            index = bisect_left(other._ends, start)
+            while index < len(other) and other._starts[index] <= window_end:
+                if other._starts[index] > start:
+                    difference.add(Window(start, other._starts[index]))
+                start = max(start, other._ends[index])
+                index += 1
+            if start < window_end:
+                difference.add(
+                    Window(start, None if window_end == math.inf else window_end)
+                )
+        return difference
+
+    def _clipped_duration(self, index, start, end):
+        return max(0, min(self._ends[index], end) - max(self._starts[index], start))
+
+
 def calculate_uptime(windows, ignore_windows, total_duration, max_duration=None):
     total_uptime = sum(window.duration for window in windows)
 
+    if not isinstance(ignore_windows, IntervalSet):
+        ignore_windows = IntervalSet(ignore_windows)
     for window in windows:
-        for ignore_window in ignore_windows:
-            if window.intersects(ignore_window):
-                total_uptime -= window.intersection(ignore_window).duration
+        total_uptime -= ignore_windows.clipped_length(window.start, window.end)
 
     total_duration_without_ignores = total_duration - sum(
         window.duration for window in ignore_windows
@@ -174,3 +310,23 @@ def combine_windows(*windows_list):
             combined_windows.append(window)
 
     return combined_windows
+
+
+class Coverage:
+    """
+    The time covered by any of a set of windows, less the ignored windows, indexed
+    so the uptime over any range is a couple of bisects
+    """
+
+    def __init__(self, windows, ignore_windows):
+        self._ignored = IntervalSet(ignore_windows)
+        self._covered = IntervalSet(combine_windows(windows)).difference(self._ignored)
+
+    def uptime(self, start, end, max_duration=None):
+        total_duration = end - start - self._ignored.clipped_length(start, end)
+        if max_duration is not None:
+            total_duration = min(total_duration, max_duration)
+
+        if not total_duration:
+            return 0
+        return self._covered.clipped_length(start, end) / total_duration
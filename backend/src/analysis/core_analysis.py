@@ -6,13 +6,55 @@ from analysis.base import (
     AnalysisScorer,
     BaseAnalyzer,
     BasePreprocessor,
+    Coverage,
+    IntervalSet,
     ScoreWeight,
     Window,
     calculate_uptime,
-    range_overlap,
 )
 from analysis.items import ItemPreprocessor, Trinket
-from report import Fight
+from report import (
+    ABILITY_CODES,
+    APPLYBUFF,
+    APPLYBUFFSTACK,
+    APPLYDEBUFF,
+    BLOOD_PLAGUE,
+    BLOOD_TAP,
+    CAST,
+    CLAW,
+    COMBATANTINFO,
+    DAMAGE,
+    EMPOWER_RUNE_WEAPON,
+    FROST_FEVER,
+    GARGOYLE_STRIKE,
+    HEAL,
+    MELEE,
+    REFRESHBUFF,
+    REFRESHDEBUFF,
+    REMOVEBUFF,
+    REMOVEBUFFSTACK,
+    REMOVEDEBUFF,
+    REMOVEDEBUFFSTACK,
+    RESOURCECHANGE,
+    STARTCAST,
+    SUMMON,
+    Fight,
+)
+
+# Boss mechanics the dead zones are detected from
+FREE_YOUR_MIND = ABILITY_CODES.code("Free Your Mind")
+SIPHON_POWER = ABILITY_CODES.code("Siphon Power")
+BLACK_HOLE = ABILITY_CODES.code("Black Hole")
+SLAG_POT = ABILITY_CODES.code("Slag Pot")
+FROST_BLAST = ABILITY_CODES.code("Frost Blast")
+WEB_SPRAY = ABILITY_CODES.code("Web Spray")
+AMBER_CARAPACE = ABILITY_CODES.code("Amber Carapace")
+DISSONANCE_FIELD = ABILITY_CODES.code("Dissonance Field")
+DAY = ABILITY_CODES.code("Day")
+HIDE = ABILITY_CODES.code("Hide")
+
+POTION_OF_MOGU_POWER = ABILITY_CODES.code("Potion of Mogu Power")
+SYNAPSE_SPRINGS = ABILITY_CODES.code("Synapse Springs")
 
 
 class DeadZoneAnalyzer(BasePreprocessor):
@@ -25,6 +67,7 @@ class DeadZoneAnalyzer(BasePreprocessor):
         "Scourge Strike",
         "Pestilence",
     }
+    MELEE_ABILITY_CODES = ABILITY_CODES.codes(MELEE_ABILITIES)
 
     class DeadZone(Window):
         def __init__(self, last_timestamp, curr_timestamp):
@@ -35,7 +78,7 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
     def __init__(self, fight: Fight):
         self._fight = fight
-        self._dead_zones = []
+        self._dead_zones = IntervalSet()
         self._last_event = None
         self._last_timestamp = 0
         self._checker = {
@@ -65,15 +108,15 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
     def _check_boss_events_occur(self, event, only_melee=False):
         if event.get("source_is_boss") or (
-            event.get("target_is_boss") and event["type"] == "cast"
+            event.get("target_is_boss") and event.type_code == CAST
         ):
-            if only_melee and event["ability"] not in self.MELEE_ABILITIES:
+            if only_melee and event.ability_code not in self.MELEE_ABILITY_CODES:
                 return
 
-            if event["timestamp"] - self._last_timestamp > 7000:
-                dead_zone = self.DeadZone(self._last_timestamp, event["timestamp"])
-                self._dead_zones.append(dead_zone)
-            self._last_timestamp = event["timestamp"]
+            if event.timestamp - self._last_timestamp > 7000:
+                dead_zone = self.DeadZone(self._last_timestamp, event.timestamp)
+                self._dead_zones.add(dead_zone)
+            self._last_timestamp = event.timestamp
 
     def _check_ascendant_council(self, event):
         if event.get("target") not in (
@@ -87,10 +130,10 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
         if (
             not self._last_event
-            and event["type"] == "damage"
-            and event["target"] in ("Arion", "Terrastra")
+            and event.type_code == DAMAGE
+            and event.target in ("Arion", "Terrastra")
             and "hitPoints" in event
-            and event["hitPoints"] / event["maxHitPoints"] <= 0.25
+            and event.hitPoints / event.maxHitPoints <= 0.25
         ):
             self._last_event = event
         if (
@@ -101,104 +144,104 @@ class DeadZoneAnalyzer(BasePreprocessor):
             and self._last_event
             and not self._dead_zones
         ):
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
     def _check_al_akir(self, event):
         if event.get("target") != "Al'Akir":
             return
         if (
             not self._last_event
-            and event["type"] == "damage"
-            and event["target"] == "Al'Akir"
+            and event.type_code == DAMAGE
+            and event.target == "Al'Akir"
             and "hitPoints" in event
-            and event["hitPoints"] / event["maxHitPoints"] <= 0.25
+            and event.hitPoints / event.maxHitPoints <= 0.25
         ):
             self._last_event = event
         if (
             self._last_event
             and not self._dead_zones
-            and event["timestamp"] - self._last_event["timestamp"] > 5000
+            and event.timestamp - self._last_event.timestamp > 5000
         ):
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
     def _check_nefarion_mind_control(self, event):
-        if event["ability"] not in ("Free Your Mind", "Siphon Power"):
+        if event.ability_code not in (FREE_YOUR_MIND, SIPHON_POWER):
             return
 
-        if not self._last_event and event["ability"] == "Siphon Power":
+        if not self._last_event and event.ability_code == SIPHON_POWER:
             self._last_event = event
-        if event["ability"] == "Free Your Mind" and self._last_event:
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        if event.ability_code == FREE_YOUR_MIND and self._last_event:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
             self._last_event = None
 
     def _check_algalon(self, event):
-        if event["type"] not in ("applydebuff", "removedebuff"):
+        if event.type_code not in (APPLYDEBUFF, REMOVEDEBUFF):
             return
 
-        if event["ability"] != "Black Hole":
+        if event.ability_code != BLACK_HOLE:
             return
 
-        if event["type"] == "applydebuff":
+        if event.type_code == APPLYDEBUFF:
             self._last_event = event
-        elif event["type"] == "removedebuff":
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        elif event.type_code == REMOVEDEBUFF:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
     def _check_ignis(self, event):
-        if event["type"] not in ("removedebuff", "applydebuff"):
+        if event.type_code not in (REMOVEDEBUFF, APPLYDEBUFF):
             return
 
-        if event["ability"] != "Slag Pot":
+        if event.ability_code != SLAG_POT:
             return
 
-        if event["type"] == "applydebuff":
+        if event.type_code == APPLYDEBUFF:
             self._last_event = event
-        elif event["type"] == "removedebuff":
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        elif event.type_code == REMOVEDEBUFF:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
     def _check_kelthuzad(self, event):
-        if event["type"] not in ("removedebuff", "applydebuff"):
+        if event.type_code not in (REMOVEDEBUFF, APPLYDEBUFF):
             return
 
-        if event["ability"] != "Frost Blast":
+        if event.ability_code != FROST_BLAST:
             return
 
-        if event["type"] == "applydebuff":
+        if event.type_code == APPLYDEBUFF:
             self._last_event = event
-        elif event["type"] == "removedebuff":
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        elif event.type_code == REMOVEDEBUFF:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
     def _check_maexxna(self, event):
-        if event["type"] not in ("removedebuff", "applydebuff"):
+        if event.type_code not in (REMOVEDEBUFF, APPLYDEBUFF):
             return
 
-        if event["ability"] != "Web Spray":
+        if event.ability_code != WEB_SPRAY:
             return
 
-        if event["type"] == "applydebuff":
+        if event.type_code == APPLYDEBUFF:
             self._last_event = event
-        elif event["type"] == "removedebuff":
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        elif event.type_code == REMOVEDEBUFF:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
     def _check_thaddius(self, event):
-        if event["type"] not in ("cast", "damage"):
+        if event.type_code not in (CAST, DAMAGE):
             return
 
         if event.get("target") not in ("Thaddius", "Stalagg", "Feugen"):
             return
 
-        if event["source"] != self._fight.source.name:
+        if event.source != self._fight.source.name:
             return
 
-        if self._last_event and self._last_event["target"] != event["target"]:
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        if self._last_event and self._last_event.target != event.target:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
         self._last_event = event
 
@@ -206,18 +249,15 @@ class DeadZoneAnalyzer(BasePreprocessor):
         if event.get("target") != "Razorscale":
             return
 
-        if event["type"] != "cast":
+        if event.type_code != CAST:
             return
 
-        if event["source"] != self._fight.source.name:
+        if event.source != self._fight.source.name:
             return
 
-        if (
-            self._last_event
-            and event["timestamp"] - self._last_event["timestamp"] > 20000
-        ):
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        if self._last_event and event.timestamp - self._last_event.timestamp > 20000:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
         self._last_event = event
 
@@ -225,18 +265,18 @@ class DeadZoneAnalyzer(BasePreprocessor):
         if event.get("target") != "Loatheb":
             return
 
-        if event["type"] != "cast" or event["ability"] not in self.MELEE_ABILITIES:
+        if (
+            event.type_code != CAST
+            or event.ability_code not in self.MELEE_ABILITY_CODES
+        ):
             return
 
-        if event["source"] != self._fight.source.name:
+        if event.source != self._fight.source.name:
             return
 
-        if (
-            self._last_event
-            and event["timestamp"] - self._last_event["timestamp"] > 2000
-        ):
-            dead_zone = self.DeadZone(self._last_event["timestamp"], event["timestamp"])
-            self._dead_zones.append(dead_zone)
+        if self._last_event and event.timestamp - self._last_event.timestamp > 2000:
+            dead_zone = self.DeadZone(self._last_event.timestamp, event.timestamp)
+            self._dead_zones.add(dead_zone)
 
         self._last_event = event
 
@@ -253,21 +293,21 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
         # Identify boss by highest maxHitPoints (typically 500M+ HP)
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("maxHitPoints")
-            and event["maxHitPoints"] > self._max_hp_seen
+            and event.maxHitPoints > self._max_hp_seen
         ):
-            self._max_hp_seen = event["maxHitPoints"]
+            self._max_hp_seen = event.maxHitPoints
             self._boss_target_id = event.get("targetID")
 
         # Track boss HP to detect 20% transition
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("targetID") == self._boss_target_id
             and event.get("hitPoints")
             and event.get("maxHitPoints")
         ):
-            hp_percentage = (event["hitPoints"] / event["maxHitPoints"]) * 100
+            hp_percentage = (event.hitPoints / event.maxHitPoints) * 100
 
             # Start dead zone when boss hits 20% HP
             if hp_percentage <= 20 and not hasattr(self, "_tornado_phase_started"):
@@ -278,8 +318,8 @@ class DeadZoneAnalyzer(BasePreprocessor):
         # Track player combat actions on the boss to detect when dead zone ends
         if (
             event.get("targetID") == self._boss_target_id
-            and event["type"] in ("cast", "damage")
-            and event["sourceID"] == self._fight.source.id
+            and event.type_code in (CAST, DAMAGE)
+            and event.sourceID == self._fight.source.id
         ):
             # If we're in tornado phase and player hits boss again, end dead zone
             if (
@@ -288,9 +328,9 @@ class DeadZoneAnalyzer(BasePreprocessor):
                 and self._last_event
             ):
                 dead_zone = DeadZoneAnalyzer.DeadZone(
-                    self._last_event["timestamp"], event["timestamp"]
+                    self._last_event.timestamp, event.timestamp
                 )
-                self._dead_zones.append(dead_zone)
+                self._dead_zones.add(dead_zone)
                 self._tornado_phase_started = False
                 self._last_event = None
 
@@ -306,33 +346,33 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
         # Identify boss by highest maxHitPoints (typically 500M+ HP)
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("maxHitPoints")
-            and event["maxHitPoints"] > self._max_hp_seen
+            and event.maxHitPoints > self._max_hp_seen
         ):
-            self._max_hp_seen = event["maxHitPoints"]
+            self._max_hp_seen = event.maxHitPoints
             self._boss_target_id = event.get("targetID")
 
         # Track the Amber Carapace buff application and removal
-        if event["type"] not in ("applybuff", "removebuff"):
+        if event.type_code not in (APPLYBUFF, REMOVEBUFF):
             return
 
-        if event["ability"] != "Amber Carapace":
+        if event.ability_code != AMBER_CARAPACE:
             return
 
         # Only track buffs on the boss using targetID
         if event.get("targetID") != self._boss_target_id:
             return
 
-        if event["type"] == "applybuff":
+        if event.type_code == APPLYBUFF:
             # Start deadzone when Amber Carapace is applied
             self._last_event = event
-        elif event["type"] == "removebuff" and self._last_event:
+        elif event.type_code == REMOVEBUFF and self._last_event:
             # End deadzone when Amber Carapace is removed
             dead_zone = DeadZoneAnalyzer.DeadZone(
-                self._last_event["timestamp"], event["timestamp"]
+                self._last_event.timestamp, event.timestamp
             )
-            self._dead_zones.append(dead_zone)
+            self._dead_zones.add(dead_zone)
             self._last_event = None
 
     def _check_grand_empress_shekzeer(self, event):
@@ -348,33 +388,33 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
         # Identify boss by highest maxHitPoints (typically 500M+ HP)
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("maxHitPoints")
-            and event["maxHitPoints"] > self._max_hp_seen
+            and event.maxHitPoints > self._max_hp_seen
         ):
-            self._max_hp_seen = event["maxHitPoints"]
+            self._max_hp_seen = event.maxHitPoints
             self._boss_target_id = event.get("targetID")
 
         # Track Dissonance Field buff application and removal on the boss
-        if event["type"] not in ("applybuff", "removebuff"):
+        if event.type_code not in (APPLYBUFF, REMOVEBUFF):
             return
 
-        if event["ability"] != "Dissonance Field":
+        if event.ability_code != DISSONANCE_FIELD:
             return
 
         # Only track buffs on the boss using targetID
         if event.get("targetID") != self._boss_target_id:
             return
 
-        if event["type"] == "applybuff":
+        if event.type_code == APPLYBUFF:
             # Start deadzone when Dissonance Field is applied
             self._last_event = event
-        elif event["type"] == "removebuff" and self._last_event:
+        elif event.type_code == REMOVEBUFF and self._last_event:
             # End deadzone when Dissonance Field is removed
             dead_zone = DeadZoneAnalyzer.DeadZone(
-                self._last_event["timestamp"], event["timestamp"]
+                self._last_event.timestamp, event.timestamp
             )
-            self._dead_zones.append(dead_zone)
+            self._dead_zones.add(dead_zone)
             self._last_event = None
 
     def _check_tsulong(self, event):
@@ -390,34 +430,34 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
         # Identify boss by highest maxHitPoints (typically 500M+ HP)
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("maxHitPoints")
-            and event["maxHitPoints"] > self._max_hp_seen
+            and event.maxHitPoints > self._max_hp_seen
         ):
-            self._max_hp_seen = event["maxHitPoints"]
+            self._max_hp_seen = event.maxHitPoints
             self._boss_target_id = event.get("targetID")
 
         # Track Day phase by monitoring when boss becomes untargetable
         # Day phase starts when "Day" buff is applied to boss
-        if event["type"] not in ("applybuff", "removebuff"):
+        if event.type_code not in (APPLYBUFF, REMOVEBUFF):
             return
 
-        if event["ability"] != "Day":
+        if event.ability_code != DAY:
             return
 
         # Only track buffs on the boss using targetID
         if event.get("targetID") != self._boss_target_id:
             return
 
-        if event["type"] == "applybuff":
+        if event.type_code == APPLYBUFF:
             # Start deadzone when Day phase begins (boss untargetable)
             self._last_event = event
-        elif event["type"] == "removebuff" and self._last_event:
+        elif event.type_code == REMOVEBUFF and self._last_event:
             # End deadzone when Day phase ends (Night phase begins)
             dead_zone = DeadZoneAnalyzer.DeadZone(
-                self._last_event["timestamp"], event["timestamp"]
+                self._last_event.timestamp, event.timestamp
             )
-            self._dead_zones.append(dead_zone)
+            self._dead_zones.add(dead_zone)
             self._last_event = None
 
     def _check_lei_shi(self, event):
@@ -433,33 +473,33 @@ class DeadZoneAnalyzer(BasePreprocessor):
 
         # Identify boss by highest maxHitPoints (typically 500M+ HP)
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("maxHitPoints")
-            and event["maxHitPoints"] > self._max_hp_seen
+            and event.maxHitPoints > self._max_hp_seen
         ):
-            self._max_hp_seen = event["maxHitPoints"]
+            self._max_hp_seen = event.maxHitPoints
             self._boss_target_id = event.get("targetID")
 
         # Track Hide phase by monitoring Hide buff application and removal
-        if event["type"] not in ("applybuff", "removebuff"):
+        if event.type_code not in (APPLYBUFF, REMOVEBUFF):
             return
 
-        if event["ability"] != "Hide":
+        if event.ability_code != HIDE:
             return
 
         # Only track buffs on the boss using targetID
         if event.get("targetID") != self._boss_target_id:
             return
 
-        if event["type"] == "applybuff":
+        if event.type_code == APPLYBUFF:
             # Start deadzone when Hide is applied (boss becomes untargetable)
             self._last_event = event
-        elif event["type"] == "removebuff" and self._last_event:
+        elif event.type_code == REMOVEBUFF and self._last_event:
             # End deadzone when Hide is removed (boss becomes targetable)
             dead_zone = DeadZoneAnalyzer.DeadZone(
-                self._last_event["timestamp"], event["timestamp"]
+                self._last_event.timestamp, event.timestamp
             )
-            self._dead_zones.append(dead_zone)
+            self._dead_zones.add(dead_zone)
             self._last_event = None
 
     def preprocess_event(self, event):
@@ -469,11 +509,8 @@ class DeadZoneAnalyzer(BasePreprocessor):
         return self._checker(event)
 
     def get_recent_dead_zone(self, end) -> DeadZone | None:
-        for dead_zone in reversed(self._dead_zones):
-            # returns the closest dead-zone
-            if dead_zone.start <= end:
-                return dead_zone
-        return None
+        # returns the closest dead-zone
+        return self._dead_zones.latest_started(end)
 
     def get_dead_zones(self):
         return [
@@ -483,9 +520,9 @@ class DeadZoneAnalyzer(BasePreprocessor):
         ]
 
     def decorate_event(self, event):
-        dead_zone = self.get_recent_dead_zone(event["timestamp"])
-        event["in_dead_zone"] = dead_zone and event["timestamp"] in dead_zone
-        event["recent_dead_zone"] = dead_zone and (dead_zone.start, dead_zone.end)
+        dead_zone = self.get_recent_dead_zone(event.timestamp)
+        event.in_dead_zone = dead_zone and event.timestamp in dead_zone
+        event.recent_dead_zone = dead_zone and (dead_zone.start, dead_zone.end)
 
 
 class Rune:
@@ -581,6 +618,8 @@ class Rune:
 
 
 class RuneHasteTracker(BaseAnalyzer):
+    EVENT_TYPES = {"applybuff", "removebuff"}
+
     HASTE_RATING_PROCS = {
         # Shrine-Cleansing Purifier
         91355: 1314,
@@ -599,6 +638,9 @@ class RuneHasteTracker(BaseAnalyzer):
         "Unholy Presence": 1.15,
         "Berserking": 1.2,
     }
+    HASTE_PERCENT_PROC_CODES = {
+        ABILITY_CODES.code(name): haste for name, haste in HASTE_PERCENT_PROCS.items()
+    }
 
     def __init__(self, combatant_info, buff_tracker, rune_tracker):
         # Some logs may not have haste information, default to 0
@@ -622,33 +664,28 @@ class RuneHasteTracker(BaseAnalyzer):
     def add_event(self, event):
         new_haste_rating = self._current_haste_rating
         if (
-            event["type"] == "applybuff"
-            and event["abilityGameID"] in self.HASTE_RATING_PROCS
+            event.type_code == APPLYBUFF
+            and event.abilityGameID in self.HASTE_RATING_PROCS
         ):
-            new_haste_rating += self.HASTE_RATING_PROCS[event["abilityGameID"]]
+            new_haste_rating += self.HASTE_RATING_PROCS[event.abilityGameID]
         if (
-            event["type"] == "removebuff"
-            and event["abilityGameID"] in self.HASTE_RATING_PROCS
+            event.type_code == REMOVEBUFF
+            and event.abilityGameID in self.HASTE_RATING_PROCS
         ):
-            new_haste_rating -= self.HASTE_RATING_PROCS[event["abilityGameID"]]
+            new_haste_rating -= self.HASTE_RATING_PROCS[event.abilityGameID]
 
         new_haste_percent = self._current_haste_percent
-        if (
-            event["type"] == "applybuff"
-            and event["ability"] in self.HASTE_PERCENT_PROCS
-        ):
-            new_haste_percent *= self.HASTE_PERCENT_PROCS[event["ability"]]
-        if (
-            event["type"] == "removebuff"
-            and event["ability"] in self.HASTE_PERCENT_PROCS
-        ):
-            new_haste_percent /= self.HASTE_PERCENT_PROCS[event["ability"]]
+        haste_percent = self.HASTE_PERCENT_PROC_CODES.get(event.ability_code)
+        if event.type_code == APPLYBUFF and haste_percent is not None:
+            new_haste_percent *= haste_percent
+        if event.type_code == REMOVEBUFF and haste_percent is not None:
+            new_haste_percent /= haste_percent
 
         if (
             new_haste_rating != self._current_haste_rating
             or new_haste_percent != self._current_haste_percent
         ):
-            self._modify_haste(event["timestamp"], new_haste_rating, new_haste_percent)
+            self._modify_haste(event.timestamp, new_haste_rating, new_haste_percent)
 
     def _modify_haste(self, timestamp, haste_rating, haste_percent):
         self._current_haste_rating = haste_rating
@@ -856,11 +893,11 @@ class RuneTracker(BaseAnalyzer):
     def add_event(self, event):
         if event.get("rune_cost"):
             runes_needed = defaultdict(int)
-            current_runes = self.current_runes(event["timestamp"])
+            current_runes = self.current_runes(event.timestamp)
             death_runes = current_runes["Death"]
 
             total_missing = 0
-            for rune_type, num_needed in event["rune_cost"].items():
+            for rune_type, num_needed in event.rune_cost.items():
                 missing = max(0, num_needed - current_runes[rune_type])
                 if missing > 0:
                     death_runes_needed = min(death_runes, missing)
@@ -872,7 +909,7 @@ class RuneTracker(BaseAnalyzer):
                 for rune in self._sorted_runes(self.runes):
                     if (
                         missing > 0
-                        and not rune.can_spend(event["timestamp"])
+                        and not rune.can_spend(event.timestamp)
                         and (rune.type == rune_type or rune.is_death)
                     ):
                         missing -= 1
@@ -880,32 +917,32 @@ class RuneTracker(BaseAnalyzer):
 
             if total_missing > 0:
                 # Sync runes to what we think they should be
-                self.resync_runes(event["timestamp"], event["rune_cost"], runes_needed)
-                event["rune_spend_adjustment"] = True
+                self.resync_runes(event.timestamp, event.rune_cost, runes_needed)
+                event.rune_spend_adjustment = True
 
-        event["runes_before"] = self._serialize(event["timestamp"])
+        event.runes_before = self._serialize(event.timestamp)
 
-        if event["type"] == "cast":
+        if event.type_code == CAST:
             if event.get("rune_cost"):
                 spent = self.spend(
-                    event["ability"],
-                    event["timestamp"],
-                    blood=event["rune_cost"]["Blood"],
-                    frost=event["rune_cost"]["Frost"],
-                    unholy=event["rune_cost"]["Unholy"],
+                    event.ability,
+                    event.timestamp,
+                    blood=event.rune_cost["Blood"],
+                    frost=event.rune_cost["Frost"],
+                    unholy=event.rune_cost["Unholy"],
                 )
-                event["rune_spend_error"] = not spent
+                event.rune_spend_error = not spent
 
-            if event["ability"] == "Blood Tap":
-                self.blood_tap(event["timestamp"])
+            if event.ability_code == BLOOD_TAP:
+                self.blood_tap(event.timestamp)
 
-            if event["ability"] == "Empower Rune Weapon":
-                self.erw(event["timestamp"])
+            if event.ability_code == EMPOWER_RUNE_WEAPON:
+                self.erw(event.timestamp)
 
-        if event["type"] == "removebuff" and event["ability"] == "Blood Tap":
+        if event.type_code == REMOVEBUFF and event.ability_code == BLOOD_TAP:
             self.stop_blood_tap()
 
-        event["runes"] = self._serialize(event["timestamp"])
+        event.runes = self._serialize(event.timestamp)
 
     def update_regen_speed(self, timestamp, rune_speed):
         """
@@ -945,6 +982,7 @@ class RuneTracker(BaseAnalyzer):
 
 
 class PrepullArmyOfTheDeadTracker(BasePreprocessor):
+    INCLUDE_PET_EVENTS = True
     # Ghouls last 40 seconds after they are target-able, assume 500ms to target
     ARMY_DURATION_MS = 40500
     ARMY_CAST_TIME_MS = 4000
@@ -955,11 +993,11 @@ class PrepullArmyOfTheDeadTracker(BasePreprocessor):
         self._runes_modified = False
 
     def preprocess_event(self, event):
-        if self._runes_modified or event["timestamp"] > self.ARMY_DURATION_MS:
+        if self._runes_modified or event.timestamp > self.ARMY_DURATION_MS:
             return
 
         if event.get("source") == "Army of the Dead":
-            self._deaths[event["sourceInstance"]] = event["source_dies_at"]
+            self._deaths[event.sourceInstance] = event.source_dies_at
 
         if len(self._deaths) == 8:
             self._modify_runes()
@@ -976,12 +1014,116 @@ class PrepullArmyOfTheDeadTracker(BasePreprocessor):
         self._runes_modified = True
 
 
+class AuraSweep:
+    """
+    Works out the active auras at each timestamp of a time-ordered walk by sweeping
+    over the window boundaries, instead of searching every window of every aura.
+    Every timestamp gets the same snapshot tuple until the active auras change,
+    along with the ability codes of the auras in it
+    """
+
+    def __init__(self, auras, sort_key):
+        """
+        :param auras: (name, ability id, icon, windows) of each aura, in the order
+            snapshots list them before sorting
+        :param sort_key: sort key for the snapshot entries
+        """
+        self._auras = auras
+        self._sort_key = sort_key
+        self._starts = sorted(
+            (window.start, aura_index, window_index)
+            for aura_index, (*_, windows) in enumerate(auras)
+            for window_index, window in enumerate(windows)
+        )
+        self._ends = sorted(
+            (window.end, aura_index, window_index)
+            for aura_index, (*_, windows) in enumerate(auras)
+            for window_index, window in enumerate(windows)
+            if window.end is not None
+        )
+        self._entries = {}
+        self._reset()
+
+    def _reset(self):
+        self._start_index = 0
+        self._end_index = 0
+        self._timestamp = None
+        # aura index -> indexes of its windows containing the timestamp
+        self._active = defaultdict(set)
+        self._snapshot = ()
+        self._snapshot_codes = frozenset()
+
+    def _entry(self, aura_index, window_index):
+        key = (aura_index, window_index)
+        entry = self._entries.get(key)
+        if entry is None:
+            name, ability_id, icon, windows = self._auras[aura_index]
+            entry = self._entries[key] = {
+                "ability": name,
+                "ability_icon": icon,
+                "abilityGameID": ability_id,
+                "start": windows[window_index].start,
+            }
+        return entry
+
+    def get_active(self, timestamp):
+        """:return: tuple of the auras active at timestamp, don't modify it"""
+        if self._timestamp is not None and timestamp < self._timestamp:
+            self._reset()
+        self._timestamp = timestamp
+
+        start_index = self._start_index
+        starts = self._starts
+        while start_index < len(starts) and starts[start_index][0] <= timestamp:
+            _, aura_index, window_index = starts[start_index]
+            self._active[aura_index].add(window_index)
+            start_index += 1
+
+        # Windows include their end, so they're only left after it
+        end_index = self._end_index
+        ends = self._ends
+        while end_index < len(ends) and ends[end_index][0] < timestamp:
+            _, aura_index, window_index = ends[end_index]
+            active = self._active[aura_index]
+            active.discard(window_index)
+            if not active:
+                del self._active[aura_index]
+            end_index += 1
+
+        changed = start_index != self._start_index or end_index != self._end_index
+        self._start_index = start_index
+        self._end_index = end_index
+
+        if changed:
+            # An aura's first window containing the timestamp is the one shown
+            snapshot = tuple(
+                sorted(
+                    (
+                        self._entry(aura_index, min(self._active[aura_index]))
+                        for aura_index in sorted(self._active)
+                    ),
+                    key=self._sort_key,
+                )
+            )
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                self._snapshot_codes = ABILITY_CODES.codes(
+                    entry["ability"] for entry in snapshot
+                )
+        return self._snapshot
+
+    @property
+    def active_codes(self):
+        """:return: ability codes of the auras in the last snapshot"""
+        return self._snapshot_codes
+
+
 class BuffWindows:
     def __init__(self, buff_name, buff_id, icon):
         self.buff_name = buff_name
         self.buff_id = buff_id
         self.icon = icon
-        self._windows = []
+        self._windows = IntervalSet()
 
     @property
     def has_window(self):
@@ -1009,19 +1151,16 @@ class BuffWindows:
         return self._windows.pop()
 
     def add_window(self, start, end=None):
-        self._windows.append(Window(start, end))
+        self._windows.add(Window(start, end))
+
+    def end_active_window(self, end):
+        self._windows.end_last(end)
 
     def contains(self, timestamp):
-        for window in self._windows:
-            if window.contains(timestamp):
-                return True
-        return False
+        return self._windows.contains(timestamp)
 
     def containing_window(self, timestamp):
-        for window in self._windows:
-            if window.contains(timestamp):
-                return window
-        return None
+        return self._windows.containing(timestamp)
 
 
 class BuffTracker(BaseAnalyzer, BasePreprocessor):
@@ -1032,6 +1171,12 @@ class BuffTracker(BaseAnalyzer, BasePreprocessor):
         self._buff_windows = {}
         self._add_starting_auras(starting_auras)
         self._presences = {"Blood Presence", "Frost Presence", "Unholy Presence"}
+        self._presence_codes = ABILITY_CODES.codes(self._presences)
+        self._sweep = None
+        self._coverages = {}
+        # (buffs, buffs with only their first presence, their codes) of the last
+        # presence event
+        self._single_presence_buffs = (None, None, None)
 
     def _get_buff_windows(self, buff_name, buff_id, icon):
         return self._buff_windows.setdefault(
@@ -1050,9 +1195,31 @@ class BuffTracker(BaseAnalyzer, BasePreprocessor):
 
         windows = self._buff_windows[buff_name].windows
         if windows and windows[-1].end is None:
-            windows[-1] = Window(windows[-1].start, self._end_time)
+            windows.end_last(self._end_time)
         return windows
 
+    def get_coverage(self, buff_names, ignore_windows) -> Coverage:
+        """
+        :return: the coverage of any of the buffs less ignore_windows, shared by every
+            caller asking for the same buffs and ignore windows. Time where windows of
+            several of the buffs overlap is only covered once
+        """
+        key = (
+            frozenset(buff_names),
+            tuple((window.start, window.end) for window in ignore_windows),
+        )
+        coverage = self._coverages.get(key)
+        if coverage is None:
+            coverage = self._coverages[key] = Coverage(
+                [
+                    window
+                    for buff_name in buff_names
+                    for window in self.get_windows(buff_name)
+                ],
+                ignore_windows,
+            )
+        return coverage
+
     @property
     def has_flask(self):
         # Check for MoP flasks that DKs would use
@@ -1114,43 +1281,43 @@ class BuffTracker(BaseAnalyzer, BasePreprocessor):
         return self._buff_windows[buff_name].has_active_window
 
     def preprocess_event(self, event):
-        if event["type"] not in (
-            "applybuff",
-            "removebuff",
-            "removebuffstack",
-            "refreshbuff",
-            "heal",
+        if event.type_code not in (
+            APPLYBUFF,
+            REMOVEBUFF,
+            REMOVEBUFFSTACK,
+            REFRESHBUFF,
+            HEAL,
         ):
             return
 
         windows = self._get_buff_windows(
-            event["ability"],
-            event["abilityGameID"],
-            event["ability_icon"],
+            event.ability,
+            event.abilityGameID,
+            event.ability_icon,
         )
 
-        if event["type"] in ("removebuffstack", "refreshbuff", "heal"):
+        if event.type_code in (REMOVEBUFFSTACK, REFRESHBUFF, HEAL):
             # If we don't have a window, assume it was a starting aura
             if not windows.has_window:
                 # resolve the issue where combatant info lags behind the first event
                 # ie. on beasts when army is snapshotted with UP
-                if event["ability"] in self._presences:
+                if event.ability_code in self._presence_codes:
                     for presence in self._presences:
                         presence_windows = self._buff_windows.get(presence)
                         if presence_windows and presence_windows.has_active_window:
                             presence_windows.pop()
                 windows.add_window(0)
-        elif event["type"] == "applybuff":
-            if event["ability"] in ("Potion of Mogu Power"):
-                if self.is_active("Potion of Mogu Power", event["timestamp"]):
+        elif event.type_code == APPLYBUFF:
+            if event.ability_code == POTION_OF_MOGU_POWER:
+                if self.is_active("Potion of Mogu Power", event.timestamp):
                     self._buff_windows["Potion of Mogu Power"].pop()
 
             if not windows.has_active_window:
-                windows.add_window(event["timestamp"])
-        elif event["type"] == "removebuff":
-            end = event["timestamp"]
+                windows.add_window(event.timestamp)
+        elif event.type_code == REMOVEBUFF:
+            end = event.timestamp
             if windows.has_active_window:
-                windows.active_window.end = end
+                windows.end_active_window(end)
             elif not windows.has_window:  # assume it was a starting aura
                 windows.add_window(0, end)
 
@@ -1196,35 +1363,46 @@ class BuffTracker(BaseAnalyzer, BasePreprocessor):
             return False
         return self._buff_windows[buff].contains(timestamp)
 
-    def get_active_buffs(self, timestamp):
-        windows = []
-
-        for buff, buff_windows in self._buff_windows.items():
-            if buff in self._buffs_to_track:
-                containing_window = buff_windows.containing_window(timestamp)
-
-                if containing_window:
-                    windows.append(
-                        {
-                            "ability": buff,
-                            "ability_icon": buff_windows.icon,
-                            "abilityGameID": buff_windows.buff_id,
-                            "start": containing_window.start,
-                        }
+    def _get_sweep(self):
+        # Built on the first decoration, once all the windows are known
+        if self._sweep is None:
+            self._sweep = AuraSweep(
+                [
+                    (
+                        buff,
+                        buff_windows.buff_id,
+                        buff_windows.icon,
+                        buff_windows.windows,
                     )
-        return sorted(
-            windows, key=lambda x: ("Presence" not in x["ability"], x["start"])
-        )
+                    for buff, buff_windows in self._buff_windows.items()
+                    if buff in self._buffs_to_track
+                ],
+                lambda x: ("Presence" not in x["ability"], x["start"]),
+            )
+        return self._sweep
+
+    def _without_extra_presences(self, buffs):
+        """:return: buffs with only their first presence, and their ability codes"""
+        if self._single_presence_buffs[0] is not buffs:
+            # only keep the first presence
+            presences = [buff for buff in buffs if "Presence" in buff["ability"]][1:]
+            single_presence_buffs = tuple(
+                buff for buff in buffs if buff not in presences
+            )
+            self._single_presence_buffs = (
+                buffs,
+                single_presence_buffs,
+                ABILITY_CODES.codes(buff["ability"] for buff in single_presence_buffs),
+            )
+        return self._single_presence_buffs[1:]
 
     def decorate_event(self, event):
-        event["buffs"] = self.get_active_buffs(event["timestamp"])
+        sweep = self._get_sweep()
+        event.buffs = sweep.get_active(event.timestamp)
+        event.buff_codes = sweep.active_codes
 
-        if event.get("ability") in self._presences:
-            # only keep the first presence
-            presences = [
-                buff for buff in event["buffs"] if "Presence" in buff["ability"]
-            ][1:]
-            event["buffs"] = [buff for buff in event["buffs"] if buff not in presences]
+        if event.ability_code in self._presence_codes:
+            event.buffs, event.buff_codes = self._without_extra_presences(event.buffs)
 
 
 class DebuffWindows:
@@ -1232,7 +1410,7 @@ class DebuffWindows:
         self.debuff_name = debuff_name
         self.debuff_id = debuff_id
         self.icon = icon
-        self._windows = []
+        self._windows = IntervalSet()
 
     @property
     def has_window(self):
@@ -1260,19 +1438,16 @@ class DebuffWindows:
         return self._windows.pop()
 
     def add_window(self, start, end=None):
-        self._windows.append(Window(start, end))
+        self._windows.add(Window(start, end))
+
+    def end_active_window(self, end):
+        self._windows.end_last(end)
 
     def contains(self, timestamp):
-        for window in self._windows:
-            if window.contains(timestamp):
-                return True
-        return False
+        return self._windows.contains(timestamp)
 
     def containing_window(self, timestamp):
-        for window in self._windows:
-            if window.contains(timestamp):
-                return window
-        return None
+        return self._windows.containing(timestamp)
 
 
 class DebuffTracker(BaseAnalyzer, BasePreprocessor):
@@ -1280,6 +1455,7 @@ class DebuffTracker(BaseAnalyzer, BasePreprocessor):
         self._end_time = end_time
         self._source_id = source_id
         self._debuff_windows = {}
+        self._sweep = None
 
     def _get_debuff_windows(self, debuff_name, debuff_id, icon):
         return self._debuff_windows.setdefault(
@@ -1298,16 +1474,16 @@ class DebuffTracker(BaseAnalyzer, BasePreprocessor):
 
         windows = self._debuff_windows[debuff_name].windows
         if windows and windows[-1].end is None:
-            windows[-1] = Window(windows[-1].start, self._end_time)
+            windows.end_last(self._end_time)
         return windows
 
     def preprocess_event(self, event):
         # Only process debuff events
-        if event["type"] not in (
-            "applydebuff",
-            "removedebuff",
-            "removedebuffstack",
-            "refreshdebuff",
+        if event.type_code not in (
+            APPLYDEBUFF,
+            REMOVEDEBUFF,
+            REMOVEDEBUFFSTACK,
+            REFRESHDEBUFF,
         ):
             return
 
@@ -1320,42 +1496,42 @@ class DebuffTracker(BaseAnalyzer, BasePreprocessor):
             return
 
         windows = self._get_debuff_windows(
-            event["ability"],
-            event["abilityGameID"],
-            event["ability_icon"],
+            event.ability,
+            event.abilityGameID,
+            event.ability_icon,
         )
 
-        if event["type"] in ("refreshdebuff"):
+        if event.type_code == REFRESHDEBUFF:
             # If we don't have a window, assume it was already applied
             if not windows.has_window:
                 windows.add_window(0)
-        elif event["type"] == "applydebuff":
+        elif event.type_code == APPLYDEBUFF:
             if not windows.has_active_window:
-                windows.add_window(event["timestamp"])
-        elif event["type"] in ("removedebuff", "removedebuffstack"):
-            end = event["timestamp"]
+                windows.add_window(event.timestamp)
+        elif event.type_code in (REMOVEDEBUFF, REMOVEDEBUFFSTACK):
+            end = event.timestamp
             if windows.has_active_window:
-                windows.active_window.end = end
-
-    def get_active_debuffs(self, timestamp):
-        windows = []
-
-        for debuff, debuff_windows in self._debuff_windows.items():
-            containing_window = debuff_windows.containing_window(timestamp)
-
-            if containing_window:
-                windows.append(
-                    {
-                        "ability": debuff,
-                        "ability_icon": debuff_windows.icon,
-                        "abilityGameID": debuff_windows.debuff_id,
-                        "start": containing_window.start,
-                    }
-                )
-        return sorted(windows, key=lambda x: x["start"])
+                windows.end_active_window(end)
+
+    def _get_sweep(self):
+        # Built on the first decoration, once all the windows are known
+        if self._sweep is None:
+            self._sweep = AuraSweep(
+                [
+                    (
+                        debuff,
+                        debuff_windows.debuff_id,
+                        debuff_windows.icon,
+                        debuff_windows.windows,
+                    )
+                    for debuff, debuff_windows in self._debuff_windows.items()
+                ],
+                lambda x: x["start"],
+            )
+        return self._sweep
 
     def decorate_event(self, event):
-        event["debuffs"] = self.get_active_debuffs(event["timestamp"])
+        event.debuffs = self._get_sweep().get_active(event.timestamp)
 
     def score(self):
         return 1
@@ -1371,23 +1547,26 @@ class PetNameDetector(BasePreprocessor):
         self._pet_names = {}
 
     def preprocess_event(self, event):
-        if event["source"] in ("Army of the Dead", "Ghoul", "Ebon Gargoyle"):
+        if event.source in ("Army of the Dead", "Ghoul", "Ebon Gargoyle"):
             return
 
-        if event.get("ability") == "Gargoyle Strike":
-            self._pet_names[event["sourceID"]] = "Ebon Gargoyle"
-        if event.get("ability") == "Claw":
+        if event.ability_code == GARGOYLE_STRIKE:
+            self._pet_names[event.sourceID] = "Ebon Gargoyle"
+        if event.ability_code == CLAW:
             if event.get("sourceInstance", 0) > 0:
-                self._pet_names[event["sourceID"]] = "Army of the Dead"
+                self._pet_names[event.sourceID] = "Army of the Dead"
             else:
-                self._pet_names[event["sourceID"]] = "Ghoul"
+                self._pet_names[event.sourceID] = "Ghoul"
 
     def decorate_event(self, event):
         if event.get("sourceID") in self._pet_names:
-            event["source"] = self._pet_names[event["sourceID"]]
+            event.source = self._pet_names[event.sourceID]
 
 
 class RPAnalyzer(BaseAnalyzer):
+    COLUMNAR = True
+    EVENT_TYPES = {"cast", "resourcechange"}
+
     def __init__(self, ignore_windows=None):
         self._count_wasted = 0
         self._sum_wasted = 0
@@ -1400,12 +1579,24 @@ class RPAnalyzer(BaseAnalyzer):
         if event.get("in_dead_zone"):
             return
 
-        if event["type"] == "cast" and event.get("runic_power_waste", 0) > 0:
+        if event.type_code == CAST and event.get("runic_power_waste", 0) > 0:
             self._count_wasted += 1
-            self._sum_wasted += event["runic_power_waste"] // 10
-        if event["type"] == "resourcechange" and "runic_power_gained_ams" in event:
+            self._sum_wasted += event.runic_power_waste // 10
+        if event.type_code == RESOURCECHANGE and "runic_power_gained_ams" in event:
             self._count_gained += 1
-            self._sum_gained += event["runic_power_gained_ams"] // 10
+            self._sum_gained += event.runic_power_gained_ams // 10
+
+    def add_columns(self, columns):
+        live = ~columns.in_dead_zone
+        wasted = live & columns.is_type(CAST) & (columns.runic_power_waste > 0)
+        self._count_wasted += columns.count(wasted)
+        self._sum_wasted += int((columns.runic_power_waste[wasted] // 10).sum())
+
+        gained = (
+            live & columns.is_type(RESOURCECHANGE) & columns.has_runic_power_gained_ams
+        )
+        self._count_gained += columns.count(gained)
+        self._sum_gained += int((columns.runic_power_gained_ams[gained] // 10).sum())
 
     def score(self):
         waste = self._sum_wasted - self._sum_gained
@@ -1429,6 +1620,8 @@ class RPAnalyzer(BaseAnalyzer):
 
 
 class GCDAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+
     NO_GCD = {
         "Pillar of Frost",
         "Blood Tap",
@@ -1452,6 +1645,7 @@ class GCDAnalyzer(BaseAnalyzer):
         "Frost Presence",
         "Unholy Presence",
     }
+    NO_GCD_CODES = ABILITY_CODES.codes(NO_GCD)
 
     def __init__(self, source_id, buff_tracker: BuffTracker):
         self._gcds = []
@@ -1460,33 +1654,33 @@ class GCDAnalyzer(BaseAnalyzer):
         self._buff_tracker = buff_tracker
 
     def add_event(self, event):
-        if not event["type"] == "cast":
+        if not event.type_code == CAST:
             return
 
-        if event["sourceID"] != self._source_id:
+        if event.sourceID != self._source_id:
             return
 
         if self._last_event is None:
-            offset = event["timestamp"]
+            offset = event.timestamp
             last_timestamp = 0
         else:
-            if event["recent_dead_zone"]:
-                if event["in_dead_zone"]:
-                    last_timestamp = event["timestamp"]
+            if event.recent_dead_zone:
+                if event.in_dead_zone:
+                    last_timestamp = event.timestamp
                 else:
                     last_timestamp = max(
-                        event["recent_dead_zone"][1], self._last_event["timestamp"]
+                        event.recent_dead_zone[1], self._last_event.timestamp
                     )
             else:
-                last_timestamp = self._last_event["timestamp"]
+                last_timestamp = self._last_event.timestamp
 
-            offset = event["timestamp"] - last_timestamp
+            offset = event.timestamp - last_timestamp
 
-        event["gcd_offset"] = offset
-        event["has_gcd"] = event["ability"] not in self.NO_GCD
+        event.gcd_offset = offset
+        event.has_gcd = event.ability_code not in self.NO_GCD_CODES
 
-        if event["has_gcd"]:
-            self._gcds.append((event["timestamp"], last_timestamp))
+        if event.has_gcd:
+            self._gcds.append((event.timestamp, last_timestamp))
             self._last_event = event
 
     @property
@@ -1530,6 +1724,8 @@ class GCDAnalyzer(BaseAnalyzer):
 
 class DiseaseAnalyzer(BaseAnalyzer):
     DISEASE_DURATION_MS = 33000
+    EVENT_TYPES = {"removedebuff"}
+    ABILITIES = {"Blood Plague", "Frost Fever"}
 
     def __init__(self, encounter_name, fight_end_time):
         self._dropped_diseases_timestamp = []
@@ -1538,19 +1734,15 @@ class DiseaseAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         if (
-            event["type"] == "removedebuff"
-            and event["ability"]
-            in (
-                "Blood Plague",
-                "Frost Fever",
-            )
-            and event["target_is_boss"]
-            and (self._encounter_name != "Thaddius" or not event["in_dead_zone"])
+            event.type_code == REMOVEDEBUFF
+            and event.ability_code in (BLOOD_PLAGUE, FROST_FEVER)
+            and event.target_is_boss
+            and (self._encounter_name != "Thaddius" or not event.in_dead_zone)
         ):
-            if not event["target_dies_at"] or (
-                event["target_dies_at"] - event["timestamp"] > 10000
+            if not event.target_dies_at or (
+                event.target_dies_at - event.timestamp > 10000
             ):
-                self._dropped_diseases_timestamp.append(event["timestamp"])
+                self._dropped_diseases_timestamp.append(event.timestamp)
 
     @property
     def num_diseases_dropped(self):
@@ -1584,6 +1776,8 @@ class DiseaseAnalyzer(BaseAnalyzer):
 
 
 class TalentPreprocessor(BasePreprocessor):
+    REQUIRES_FIRST_PASS = False
+
     def __init__(self, combatant_info):
         self._combatant_info = combatant_info
         self._disease_duration = 21000
@@ -1598,10 +1792,12 @@ class TalentPreprocessor(BasePreprocessor):
 
     def decorate_event(self, event):
         # Blood Tap in MoP works with blood charges, not cooldowns
-        event["disease_duration"] = self._disease_duration
+        event.disease_duration = self._disease_duration
 
 
 class SoulReaperAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"damage"}
+
     def __init__(self, fight_duration, fight_end_time, ignore_windows=None):
         self._fight_duration = fight_duration
         self._fight_end_time = fight_end_time
@@ -1615,42 +1811,42 @@ class SoulReaperAnalyzer(BaseAnalyzer):
     def add_event(self, event):
         # Track boss HP to detect 35% threshold - identify boss by highest max HP
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("hitPoints")
             and event.get("maxHitPoints")
         ):
             # Identify boss as target with highest max HP
-            if self._boss_max_hp is None or event["maxHitPoints"] > self._boss_max_hp:
-                self._boss_target_id = event["targetID"]
-                self._boss_max_hp = event["maxHitPoints"]
+            if self._boss_max_hp is None or event.maxHitPoints > self._boss_max_hp:
+                self._boss_target_id = event.targetID
+                self._boss_max_hp = event.maxHitPoints
 
             # Only track HP changes for the boss target
-            if event["targetID"] == self._boss_target_id:
-                self._boss_current_hp = event["hitPoints"]
+            if event.targetID == self._boss_target_id:
+                self._boss_current_hp = event.hitPoints
 
                 # Check if boss just hit 35%
                 hp_percentage = (self._boss_current_hp / self._boss_max_hp) * 100
                 if hp_percentage <= 35 and self._execute_phase_start is None:
-                    self._execute_phase_start = event["timestamp"]
+                    self._execute_phase_start = event.timestamp
 
         # Track Soul Reaper hits/damage - only on boss target
         if (
-            event["type"] == "damage"
+            event.type_code == DAMAGE
             and event.get("abilityGameID") == 114867
-            and event["targetID"] == self._boss_target_id
+            and event.targetID == self._boss_target_id
         ):
             # Check if this hit occurred within 3 seconds AFTER execute phase starts
             time_after_execute = None
             hit_in_execute_window = False
 
             if self._execute_phase_start is not None:
-                time_after_execute = event["timestamp"] - self._execute_phase_start
+                time_after_execute = event.timestamp - self._execute_phase_start
                 # Count all hits AFTER execute phase starts (entire execute window)
                 hit_in_execute_window = time_after_execute > 0
 
             self._soul_reaper_hits.append(
                 {
-                    "timestamp": event["timestamp"],
+                    "timestamp": event.timestamp,
                     "target": event.get("targetID"),
                     "damage": event.get("amount", 0),
                     "time_after_execute": time_after_execute,
@@ -1768,6 +1964,9 @@ class SoulReaperAnalyzer(BaseAnalyzer):
 
 
 class EmpoweredRuneWeaponAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Empower Rune Weapon"}
+
     def __init__(self):
         self._erw_usages = []
         self._total_runes_wasted = 0
@@ -1775,7 +1974,7 @@ class EmpoweredRuneWeaponAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         # Track Empowered Rune Weapon casts
-        if event["type"] == "cast" and event["ability"] == "Empower Rune Weapon":
+        if event.type_code == CAST and event.ability_code == EMPOWER_RUNE_WEAPON:
             runes_before = event.get("runes_before", [])
             rp_before = event.get("runic_power", 0)
 
@@ -1789,7 +1988,7 @@ class EmpoweredRuneWeaponAnalyzer(BaseAnalyzer):
 
             # Track this usage
             erw_usage = {
-                "timestamp": event["timestamp"],
+                "timestamp": event.timestamp,
                 "runes_wasted": available_runes,
                 "rp_wasted": rp_waste,
                 "rp_before": rp_before,
@@ -1843,11 +2042,11 @@ class BloodChargeCapAnalyzer(BaseAnalyzer):
     def add_event(self, event):
         if not self._has_blood_tap_talent:
             # Set blood_charges to 0 for players without the talent
-            event["blood_charges"] = 0
+            event.blood_charges = 0
             return
 
         # Handle combatantinfo events for initial state
-        if event["type"] == "combatantinfo":
+        if event.type_code == COMBATANTINFO:
             # Check if player starts with Blood Charge buff
             auras = event.get("auras", [])
             for aura in auras:
@@ -1859,16 +2058,16 @@ class BloodChargeCapAnalyzer(BaseAnalyzer):
                     break
 
         # First set current charges on the event (this will be the "before" state)
-        event["blood_charges"] = self._current_charges
+        event.blood_charges = self._current_charges
 
         # Track Blood Charge stacks from actual buff events (spell ID: 114851)
         if event.get("abilityGameID") == 114851:
-            if event["type"] == "applybuffstack":
+            if event.type_code == APPLYBUFFSTACK:
                 old_charges = self._current_charges
                 new_charges = event.get("stack", 0)
                 self._current_charges = new_charges
                 # Update the event to show the new charges (after the change)
-                event["blood_charges"] = new_charges
+                event.blood_charges = new_charges
 
                 # Check if this buff change represents charge waste (didn't get the full +2)
                 # We expect +2 charges from Death Coil/Frost Strike/Rune Strike
@@ -1882,9 +2081,7 @@ class BloodChargeCapAnalyzer(BaseAnalyzer):
                     self._total_charges_wasted += charges_wasted
                     self._cap_events.append(
                         {
-                            "timestamp": event[
-                                "timestamp"
-                            ],  # Use the buff event timestamp
+                            "timestamp": event.timestamp,  # Use the buff event timestamp
                             "type": "blood_charge_cap",
                             "ability": "Blood Charge Waste",
                             "charges_before": old_charges,
@@ -1893,21 +2090,21 @@ class BloodChargeCapAnalyzer(BaseAnalyzer):
                         }
                     )
 
-            elif event["type"] == "removebuffstack":
+            elif event.type_code == REMOVEBUFFSTACK:
                 new_charges = event.get("stack", 0)
                 self._current_charges = new_charges
                 # Update the event to show the new charges (after the change)
-                event["blood_charges"] = new_charges
-            elif event["type"] == "applybuff":
+                event.blood_charges = new_charges
+            elif event.type_code == APPLYBUFF:
                 # First time buff is applied - but check if there's a stack count
                 initial_charges = event.get(
                     "stack", 2
                 )  # Default to 2 if no stack specified
                 self._current_charges = initial_charges
-                event["blood_charges"] = initial_charges
-            elif event["type"] == "removebuff":
+                event.blood_charges = initial_charges
+            elif event.type_code == REMOVEBUFF:
                 self._current_charges = 0  # All charges consumed
-                event["blood_charges"] = 0
+                event.blood_charges = 0
 
     def score(self):
         if not self._has_blood_tap_talent:
@@ -1934,6 +2131,9 @@ class BloodChargeCapAnalyzer(BaseAnalyzer):
 
 
 class SynapseSpringsAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Synapse Springs"}
+
     def __init__(self, fight_duration, ignore_windows=None):
         self._fight_duration = fight_duration
         self._ignore_windows = ignore_windows or []
@@ -1944,7 +2144,7 @@ class SynapseSpringsAnalyzer(BaseAnalyzer):
         if event.get("in_dead_zone"):
             return
 
-        if event["type"] == "cast" and event["ability"] == "Synapse Springs":
+        if event.type_code == CAST and event.ability_code == SYNAPSE_SPRINGS:
             self._num_synapse_springs += 1
 
     @property
@@ -1972,6 +2172,8 @@ class SynapseSpringsAnalyzer(BaseAnalyzer):
 
 
 class CoreAbilities(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+
     CORE_ABILITIES = {
         "Icy Touch",
         "Plague Strike",
@@ -1986,13 +2188,14 @@ class CoreAbilities(BaseAnalyzer):
         "Frost Strike",
         "Death and Decay",
     }
+    CORE_ABILITY_CODES = ABILITY_CODES.codes(CORE_ABILITIES)
 
     def add_event(self, event):
-        if event["type"] == "cast":
-            if event["ability"] in self.CORE_ABILITIES:
-                event["is_core_cast"] = True
+        if event.type_code == CAST:
+            if event.ability_code in self.CORE_ABILITY_CODES:
+                event.is_core_cast = True
             else:
-                event["is_core_cast"] = False
+                event.is_core_cast = False
 
     def score(self):
         return 1  # CoreAbilities is just for event decoration, always perfect score
@@ -2017,7 +2220,7 @@ class MeleeUptimeAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         if self._window and self._window.end is None:
-            if event["timestamp"] - self._last_swing_at >= self._max_swing_speed:
+            if event.timestamp - self._last_swing_at >= self._max_swing_speed:
                 self._window.end = min(
                     self._last_swing_at + self._max_swing_speed / 2,
                     self._fight_duration,
@@ -2025,13 +2228,13 @@ class MeleeUptimeAnalyzer(BaseAnalyzer):
 
         if (
             self.predicate(event)
-            and event["type"] == "cast"
-            and event["ability"] == "Melee"
+            and event.type_code == CAST
+            and event.ability_code == MELEE
         ):
             if self._window is None or self._window.end is not None:
-                self._window = Window(event["timestamp"])
+                self._window = Window(event.timestamp)
                 self._windows.append(self._window)
-            self._last_swing_at = event["timestamp"]
+            self._last_swing_at = event.timestamp
 
     def uptime(self):
         if self._windows and self._windows[-1].end is None:
@@ -2053,6 +2256,8 @@ class MeleeUptimeAnalyzer(BaseAnalyzer):
 
 
 class TrinketAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"applybuff"}
+
     def __init__(self, fight_duration, items: ItemPreprocessor):
         self._fight_duration = fight_duration
         self._items = items
@@ -2065,8 +2270,8 @@ class TrinketAnalyzer(BaseAnalyzer):
         )
 
     def add_event(self, event):
-        if event["type"] == "applybuff" and self._items.has_trinket(event["ability"]):
-            self._trinket_usages[event["ability"]] += 1
+        if event.type_code == APPLYBUFF and self._items.has_trinket(event.ability):
+            self._trinket_usages[event.ability] += 1
 
     def report(self):
         return {
@@ -2122,40 +2327,14 @@ class BuffUptimeAnalyzer(BaseAnalyzer):
         else:
             self._buff_names = {buff_names}
 
-    def _get_windows(self):
-        for buff_name in self._buff_names:
-            yield from self._buff_tracker.get_windows(buff_name)
-
     def set_start_time(self, start_time):
         self._start_time = start_time
 
-    def _clamp_windows(self, windows):
-        clamped_windows = []
-
-        for _i, window in enumerate(windows):
-            if not range_overlap(
-                (window.start, window.end), (self._start_time, self._end_time)
-            ):
-                continue
-
-            clamped_window = Window(window.start, window.end)
-            if window.end > self._end_time:
-                clamped_window.end = self._end_time
-            if window.start < self._start_time:
-                clamped_window.start = self._start_time
-            clamped_windows.append(clamped_window)
-
-        return clamped_windows
-
     def uptime(self):
-        windows = list(self._get_windows())
-        windows = self._clamp_windows(windows)
-        ignore_windows = self._clamp_windows(self._ignore_windows)
-        total_duration = self._end_time - self._start_time
-
-        uptime = calculate_uptime(
-            windows, ignore_windows, total_duration, self._max_duration
+        coverage = self._buff_tracker.get_coverage(
+            self._buff_names, self._ignore_windows
         )
+        uptime = coverage.uptime(self._start_time, self._end_time, self._max_duration)
         return min(1, uptime)
 
     def score(self):
@@ -2275,10 +2454,10 @@ class ArmyWindow(Window):
             )
 
     def _set_army_first_attack(self, event):
-        self._army_first_attack = event["timestamp"]
+        self._army_first_attack = event.timestamp
         # Set start time for all uptime analyzers when army first attacks
         for uptime in self._uptimes:
-            uptime.set_start_time(event["timestamp"])
+            uptime.set_start_time(event.timestamp)
 
     # Properties for frontend compatibility
     @property
@@ -2331,14 +2510,14 @@ class ArmyWindow(Window):
         # Track army attacks and damage using tracked source IDs
         if self._army_source_ids and event.get("sourceID") in self._army_source_ids:
             if (
-                event["type"] in ("cast", "startcast", "damage")
+                event.type_code in (CAST, STARTCAST, DAMAGE)
                 and self._army_first_attack is None
             ):
                 self._set_army_first_attack(event)
 
-            if event["type"] == "damage":
+            if event.type_code == DAMAGE:
                 self.num_attacks += 1
-                self.total_damage += event["amount"]
+                self.total_damage += event.amount
 
     def score(self):
         # Score based on buff uptime during army window
@@ -2398,11 +2577,11 @@ class ArmyAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         # Check for Army of the Dead by summon events (first summon creates the window)
-        if event["type"] == "summon" and event.get("abilityGameID") in (42650, 42651):
+        if event.type_code == SUMMON and event.get("abilityGameID") in (42650, 42651):
             # Create window only on the first summon (if no window exists yet)
             if not self._window:
                 self._window = ArmyWindow(
-                    event["timestamp"],
+                    event.timestamp,
                     self._fight_duration,
                     self._buff_tracker,
                     self._ignore_windows,
@@ -2419,7 +2598,7 @@ class ArmyAnalyzer(BaseAnalyzer):
             return
 
         # Only process events within the army window timeframe
-        if event["timestamp"] <= self._window.end:
+        if event.timestamp <= self._window.end:
             self._window.add_event(event)
 
     @property
@@ -2476,6 +2655,8 @@ class ArmyAnalyzer(BaseAnalyzer):
 
 
 class PlagueLeechAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+
     def __init__(self, fight_duration, combatant_info):
         self._fight_duration = fight_duration
         self._plague_leech_casts = []
@@ -2494,8 +2675,8 @@ class PlagueLeechAnalyzer(BaseAnalyzer):
             return
 
         # Track Plague Leech casts (ability ID 123693)
-        if event["type"] == "cast" and event.get("abilityGameID") == 123693:
-            self._plague_leech_casts.append(event["timestamp"])
+        if event.type_code == CAST and event.get("abilityGameID") == 123693:
+            self._plague_leech_casts.append(event.timestamp)
 
     @property
     def has_plague_leech_talent(self):
@@ -14,10 +14,31 @@ from analysis.core_analysis import (
 )
 from analysis.unholy_analysis import BloodPlagueAnalyzer, FrostFeverAnalyzer
 from console_table import console
-from report import Fight
+from report import (
+    ABILITY_CODES,
+    APPLYBUFF,
+    CAST,
+    DAMAGE,
+    FROST_STRIKE,
+    HOWLING_BLAST,
+    KILLING_MACHINE,
+    OBLITERATE,
+    REFRESHBUFF,
+    REMOVEBUFF,
+    RIME,
+    STARTCAST,
+    SUMMON,
+    Fight,
+)
+
+PILLAR_OF_FROST = ABILITY_CODES.code("Pillar of Frost")
+PLAGUE_STRIKE = ABILITY_CODES.code("Plague Strike")
 
 
 class KMAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"applybuff", "refreshbuff", "removebuff", "cast"}
+    ABILITIES = {"Killing Machine", "Obliterate", "Frost Strike"}
+
     class Window:
         def __init__(self, timestamp):
             self.gained_timestamp = timestamp
@@ -34,43 +55,43 @@ class KMAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         # Track KM buff events
-        if event.get("ability") == "Killing Machine":
-            if event["type"] in ("refreshbuff", "applybuff"):
-                self._window = self.Window(event["timestamp"])
+        if event.ability_code == KILLING_MACHINE:
+            if event.type_code in (REFRESHBUFF, APPLYBUFF):
+                self._window = self.Window(event.timestamp)
                 self._windows.append(self._window)
             # Could have no window if a previous KM proc was carried over
-            elif event["type"] == "removebuff" and self._window:
-                if event["timestamp"] - self._window.gained_timestamp < 30000:
-                    self._window.used_timestamp = event["timestamp"]
+            elif event.type_code == REMOVEBUFF and self._window:
+                if event.timestamp - self._window.gained_timestamp < 30000:
+                    self._window.used_timestamp = event.timestamp
                 self._window = None
             return
 
         # Track abilities that consume KM procs
         if (
-            event["type"] == "cast"
-            and event["ability"] in ("Obliterate", "Frost Strike")
+            event.type_code == CAST
+            and event.ability_code in (OBLITERATE, FROST_STRIKE)
             and event.get("consumes_km")
             and self._window
         ):
 
             # Record what ability consumed the KM proc
-            self._window.consuming_ability = event["ability"]
-            self._window.consuming_ability_timestamp = event["timestamp"]
+            self._window.consuming_ability = event.ability
+            self._window.consuming_ability_timestamp = event.timestamp
 
             # Count KM usage by ability type
-            if event["ability"] == "Frost Strike":
+            if event.ability_code == FROST_STRIKE:
                 self._km_on_frost_strike += 1
-            elif event["ability"] == "Obliterate":
+            elif event.ability_code == OBLITERATE:
                 self._km_on_obliterate += 1
 
             # Calculate delay for this usage
-            delay = event["timestamp"] - self._window.gained_timestamp
+            delay = event.timestamp - self._window.gained_timestamp
 
             # Create timeline event for KM usage timing
             km_usage_event = {
-                "timestamp": event["timestamp"],
+                "timestamp": event.timestamp,
                 "type": "km_usage_timing",
-                "ability": event["ability"],
+                "ability": event.ability,
                 "sourceID": event.get("sourceID"),
                 "targetID": event.get("targetID"),
                 "km_delay_ms": delay,
@@ -191,19 +212,22 @@ class KMAnalyzer(BaseAnalyzer):
 
 
 class HowlingBlastAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Howling Blast"}
+
     def __init__(self):
         self._bad_usages = 0
 
     def add_event(self, event):
-        if event["type"] == "cast" and event["ability"] == "Howling Blast":
-            if event["num_targets"] >= 3 or event["consumes_rime"]:
+        if event.type_code == CAST and event.ability_code == HOWLING_BLAST:
+            if event.num_targets >= 3 or event.consumes_rime:
                 is_bad = False
-            elif event["num_targets"] == 2 and event["consumes_km"]:
+            elif event.num_targets == 2 and event.consumes_km:
                 is_bad = False
             else:
                 is_bad = True
 
-            event["bad_howling_blast"] = is_bad
+            event.bad_howling_blast = is_bad
             if is_bad:
                 self._bad_usages += 1
 
@@ -234,12 +258,14 @@ class HowlingBlastAnalyzer(BaseAnalyzer):
 
 
 class RimeAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"applybuff", "refreshbuff", "cast"}
+
     def __init__(self, buff_tracker: BuffTracker):
         self._num_total = 1 if buff_tracker.is_active("Rime", 0) else 0
         self._num_used = 0
 
     def add_event(self, event):
-        if event["type"] in ("applybuff", "refreshbuff") and event["ability"] == "Rime":
+        if event.type_code in (APPLYBUFF, REFRESHBUFF) and event.ability_code == RIME:
             self._num_total += 1
         if event.get("consumes_rime"):
             self._num_used += 1
@@ -374,10 +400,10 @@ class RaiseDeadWindow(Window):
             )
 
     def _set_ghoul_first_attack(self, event):
-        self._ghoul_first_attack = event["timestamp"]
+        self._ghoul_first_attack = event.timestamp
         # Set start time for all uptime analyzers when ghoul first attacks
         for uptime in self._uptimes:
-            uptime.set_start_time(event["timestamp"])
+            uptime.set_start_time(event.timestamp)
 
     # Properties for frontend compatibility
     @property
@@ -430,14 +456,14 @@ class RaiseDeadWindow(Window):
         # Track ghoul attacks and damage using the tracked sourceID
         if self._ghoul_source_id and event.get("sourceID") == self._ghoul_source_id:
             if (
-                event["type"] in ("cast", "startcast", "damage")
+                event.type_code in (CAST, STARTCAST, DAMAGE)
                 and self._ghoul_first_attack is None
             ):
                 self._set_ghoul_first_attack(event)
 
-            if event["type"] == "damage":
+            if event.type_code == DAMAGE:
                 self.num_attacks += 1
-                self.total_damage += event["amount"]
+                self.total_damage += event.amount
 
     def score(self):
         # Score based on buff uptime during ghoul window
@@ -496,12 +522,12 @@ class RaiseDeadAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         # Check for Raise Dead by ability ID - 46585 is the Frost DK version
-        if event["type"] in ("cast", "summon") and event.get("abilityGameID") in (
+        if event.type_code in (CAST, SUMMON) and event.get("abilityGameID") in (
             46585,
             52150,
         ):
             self._window = RaiseDeadWindow(
-                event["timestamp"],
+                event.timestamp,
                 self._fight_duration,
                 self._buff_tracker,
                 self._ignore_windows,
@@ -510,7 +536,7 @@ class RaiseDeadAnalyzer(BaseAnalyzer):
             self.windows.append(self._window)
 
             # Track the ghoul's sourceID from the summon event's targetID
-            if event["type"] == "summon":
+            if event.type_code == SUMMON:
                 self._ghoul_source_id = event.get("targetID")
                 self._window._ghoul_source_id = self._ghoul_source_id
 
@@ -518,7 +544,7 @@ class RaiseDeadAnalyzer(BaseAnalyzer):
             return
 
         # Only process events within the ghoul window timeframe
-        if event["timestamp"] <= self._window.end:
+        if event.timestamp <= self._window.end:
             self._window.add_event(event)
 
     @property
@@ -576,6 +602,9 @@ class RaiseDeadAnalyzer(BaseAnalyzer):
 
 
 class ObliterateAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Obliterate"}
+
     def __init__(self, fight_end_time, ignore_windows):
         self._obliterates_during_rime = 0
         self._obliterates_with_death_runes = 0
@@ -586,17 +615,14 @@ class ObliterateAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         if (
-            event["type"] == "cast"
-            and event["ability"] == "Obliterate"
-            and not event["is_miss"]
+            event.type_code == CAST
+            and event.ability_code == OBLITERATE
+            and not event.is_miss
         ):
             self._total_obliterates += 1
 
             # Check if Obliterate was cast during Rime (which is bad for Masterfrost)
-            active_buffs = event.get("buffs", [])
-            has_rime = any(buff["ability"] == "Rime" for buff in active_buffs)
-
-            if has_rime:
+            if RIME in event.buff_codes:
                 self._obliterates_during_rime += 1
 
             # Check if Obliterate used non-Death runes when Death runes were available
@@ -689,7 +715,7 @@ class ObliterateAnalyzer(BaseAnalyzer):
                             rune_description = f"{unholy_consumed}U, {frost_consumed}F, {death_consumed}D"
 
                         death_rune_event = {
-                            "timestamp": event["timestamp"],
+                            "timestamp": event.timestamp,
                             "type": "obliterate_death_rune_usage",
                             "ability": "Obliterate",
                             "sourceID": event.get("sourceID"),
@@ -736,13 +762,16 @@ class ObliterateAnalyzer(BaseAnalyzer):
 
 
 class PillarOfFrostAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Pillar of Frost"}
+
     def __init__(self, fight_duration):
         self._pillar_casts = []
         self._fight_duration = fight_duration
 
     def add_event(self, event):
-        if event["type"] == "cast" and event["ability"] == "Pillar of Frost":
-            self._pillar_casts.append(event["timestamp"])
+        if event.type_code == CAST and event.ability_code == PILLAR_OF_FROST:
+            self._pillar_casts.append(event.timestamp)
 
     @property
     def possible_pillars(self):
@@ -779,6 +808,9 @@ class PillarOfFrostAnalyzer(BaseAnalyzer):
 
 
 class PlagueStrikeAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Plague Strike"}
+
     def __init__(self):
         self._plague_strikes_with_death_runes = 0
         self._total_plague_strikes = 0
@@ -786,8 +818,8 @@ class PlagueStrikeAnalyzer(BaseAnalyzer):
 
     def add_event(self, event):
         if (
-            event["type"] == "cast"
-            and event["ability"] == "Plague Strike"
+            event.type_code == CAST
+            and event.ability_code == PLAGUE_STRIKE
             and not event.get("is_miss", False)
         ):
             self._total_plague_strikes += 1
@@ -834,7 +866,7 @@ class PlagueStrikeAnalyzer(BaseAnalyzer):
 
                     # Create timeline event for bad Death rune usage
                     death_rune_event = {
-                        "timestamp": event["timestamp"],
+                        "timestamp": event.timestamp,
                         "type": "plague_strike_death_rune_usage",
                         "ability": "Plague Strike",
                         "sourceID": event.get("sourceID"),
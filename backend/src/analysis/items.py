@@ -1,4 +1,5 @@
 from analysis.base import BasePreprocessor
+from report import APPLYBUFF
 
 
 class Trinket:
@@ -76,13 +77,13 @@ class TrinketPreprocessor(BasePreprocessor):
 
     def preprocess_event(self, event):
         if (
-            event["type"] == "applybuff"
-            and event["ability"] in self.TRINKEY_MAP_BY_BUFF_NAME
+            event.type_code == APPLYBUFF
+            and event.ability in self.TRINKEY_MAP_BY_BUFF_NAME
         ):
-            trinket = self.TRINKEY_MAP_BY_BUFF_NAME[event["ability"]]
+            trinket = self.TRINKEY_MAP_BY_BUFF_NAME[event.ability]
 
-            if event["ability"] not in self._trinkets_by_buff_name:
-                trinket.icon = event["ability_icon"]
+            if event.ability not in self._trinkets_by_buff_name:
+                trinket.icon = event.ability_icon
                 self._trinkets.append(trinket)
                 self._trinkets_by_buff_name = {
                     trinket.buff_name: trinket for trinket in self._trinkets
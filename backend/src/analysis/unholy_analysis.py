@@ -24,10 +24,35 @@ from analysis.core_analysis import (
     TrinketAnalyzer,
 )
 from analysis.items import ItemPreprocessor
-from report import Fight
+from report import (
+    ABILITY_CODES,
+    APPLYBUFF,
+    APPLYDEBUFF,
+    BEGINCAST,
+    CAST,
+    CLAW,
+    DAMAGE,
+    GARGOYLE_STRIKE,
+    MELEE,
+    REFRESHDEBUFF,
+    REMOVEDEBUFF,
+    SUMMON_GARGOYLE,
+    Fight,
+)
+
+DARK_TRANSFORMATION = ABILITY_CODES.code("Dark Transformation")
+DEATH_AND_DECAY = ABILITY_CODES.code("Death and Decay")
+FESTERING_STRIKE = ABILITY_CODES.code("Festering Strike")
+RAISE_DEAD = ABILITY_CODES.code("Raise Dead")
+SWEEPING_CLAWS = ABILITY_CODES.code("Sweeping Claws")
+GNAW = ABILITY_CODES.code("Gnaw")
+ANTI_MAGIC_SHIELD = ABILITY_CODES.code("Anti-Magic Shield")
+MAJOR_HASTE_BUFFS = ABILITY_CODES.codes(("Bloodlust", "Heroism", "Time Warp"))
 
 
 class DebuffUptimeAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"applydebuff", "removedebuff", "refreshdebuff"}
+
     class WindowManager:
         def __init__(self, end_time):
             self._windows_by_target = defaultdict(list)
@@ -63,22 +88,23 @@ class DebuffUptimeAnalyzer(BaseAnalyzer):
 
     def __init__(self, end_time, debuff_name, ignore_windows):
         self._debuff_name = debuff_name
+        self._debuff_code = ABILITY_CODES.code(debuff_name)
         self._end_time = end_time
         self._ignore_windows = ignore_windows
         self._wm = self.WindowManager(end_time)
 
     def add_event(self, event):
-        if event["type"] not in ("applydebuff", "removedebuff", "refreshdebuff"):
+        if event.type_code not in (APPLYDEBUFF, REMOVEDEBUFF, REFRESHDEBUFF):
             return
 
-        if event["ability"] != self._debuff_name:
+        if event.ability_code != self._debuff_code:
             return
 
-        if event["type"] in ("applydebuff", "refreshdebuff"):
-            if not self._wm.has_active_window(event["target"]):
-                self._wm.add_window(event["target"], event["timestamp"])
-        elif event["type"] == "removedebuff":
-            self._wm.end_window(event["target"], event["timestamp"])
+        if event.type_code in (APPLYDEBUFF, REFRESHDEBUFF):
+            if not self._wm.has_active_window(event.target):
+                self._wm.add_window(event.target, event.timestamp)
+        elif event.type_code == REMOVEDEBUFF:
+            self._wm.end_window(event.target, event.timestamp)
 
     def uptime(self):
         windows = self._wm.coalesce()
@@ -340,17 +366,17 @@ class DarkTransformationWindow(Window):
         )
 
     def _set_dark_transformation_first_attack(self, event):
-        self._dark_transformation_first_attack = event["timestamp"]
+        self._dark_transformation_first_attack = event.timestamp
         for uptime in self._uptimes:
-            uptime.set_start_time(event["timestamp"])
+            uptime.set_start_time(event.timestamp)
 
     def add_event(self, event):
         for uptime in self._uptimes:
             uptime.add_event(event)
 
-        if "Ghoul" in event["source"] and event["type"] == "damage":
+        if "Ghoul" in event.source and event.type_code == DAMAGE:
             self.num_attacks += 1
-            self.total_damage += event["amount"]
+            self.total_damage += event.amount
 
     def score(self):
         # Simplified scoring - fixed weights, no Bloodlust multipliers
@@ -388,16 +414,16 @@ class DarkTransformationAnalyzer(BaseAnalyzer):
         self._items = items
 
     def add_event(self, event):
-        if event["type"] == "applybuff" and event["ability"] == "Dark Transformation":
+        if event.type_code == APPLYBUFF and event.ability_code == DARK_TRANSFORMATION:
             self._window = DarkTransformationWindow(
-                event["timestamp"],
+                event.timestamp,
                 self._fight_duration,
                 self._buff_tracker,
                 self._ignore_windows,
                 self._items,
             )
             self.windows.append(self._window)
-        elif self._window and event["timestamp"] <= self._window.end:
+        elif self._window and event.timestamp <= self._window.end:
             self._window.add_event(event)
         else:
             self._window = None
@@ -562,10 +588,10 @@ class GargoyleWindow(Window):
             )
 
     def _set_gargoyle_first_cast(self, event):
-        self._gargoyle_first_cast = event["timestamp"]
+        self._gargoyle_first_cast = event.timestamp
         # Set start time for all uptime analyzers when gargoyle first casts (like DT does)
         for uptime in self._uptimes:
-            uptime.set_start_time(event["timestamp"])
+            uptime.set_start_time(event.timestamp)
 
     # Properties for frontend compatibility - return uptime as fractions for formatUpTime
     @property
@@ -630,20 +656,20 @@ class GargoyleWindow(Window):
         for uptime in self._uptimes:
             uptime.add_event(event)
 
-        if event["source"] == "Ebon Gargoyle":
+        if event.source == "Ebon Gargoyle":
             if (
-                event["type"] in ("cast", "begincast")
+                event.type_code in (CAST, BEGINCAST)
                 and self._gargoyle_first_cast is None
             ):
                 self._set_gargoyle_first_cast(event)
-            if event["type"] == "cast":
-                if event["ability"] == "Melee":
+            if event.type_code == CAST:
+                if event.ability_code == MELEE:
                     self.num_melees += 1
-                if event["ability"] == "Gargoyle Strike":
+                if event.ability_code == GARGOYLE_STRIKE:
                     self.num_casts += 1
 
-        if event["type"] == "damage" and event["source"] == "Ebon Gargoyle":
-            self.total_damage += event["amount"]
+        if event.type_code == DAMAGE and event.source == "Ebon Gargoyle":
+            self.total_damage += event.amount
 
     def score(self):
         # Simplified scoring - no more Bloodlust multipliers
@@ -686,9 +712,9 @@ class GargoyleAnalyzer(BaseAnalyzer):
         self._items = items
 
     def add_event(self, event):
-        if event["type"] == "cast" and event["ability"] == "Summon Gargoyle":
+        if event.type_code == CAST and event.ability_code == SUMMON_GARGOYLE:
             self._window = GargoyleWindow(
-                event["timestamp"],
+                event.timestamp,
                 self._fight_duration,
                 self._buff_tracker,
                 self._ignore_windows,
@@ -700,7 +726,7 @@ class GargoyleAnalyzer(BaseAnalyzer):
             return
 
         # Only process events within the gargoyle window timeframe
-        if event["timestamp"] <= self._window.end:
+        if event.timestamp <= self._window.end:
             self._window.add_event(event)
 
     @property
@@ -762,6 +788,9 @@ class GargoyleAnalyzer(BaseAnalyzer):
 
 
 class DeathAndDecayUptimeAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"damage"}
+    ABILITIES = {"Death and Decay"}
+
     def __init__(self, fight_duration, ignore_windows, items):
         self._dnd_ticks = 0
         self._last_tick_time = None
@@ -777,13 +806,13 @@ class DeathAndDecayUptimeAnalyzer(BaseAnalyzer):
         return False
 
     def add_event(self, event):
-        if event["type"] == "damage" and event["ability"] == "Death and Decay":
+        if event.type_code == DAMAGE and event.ability_code == DEATH_AND_DECAY:
             if (
                 self._last_tick_time is None
-                or event["timestamp"] - self._last_tick_time > 800
-            ) and not self._is_in_ignore_window(event["timestamp"]):
+                or event.timestamp - self._last_tick_time > 800
+            ) and not self._is_in_ignore_window(event.timestamp):
                 self._dnd_ticks += 1
-                self._last_tick_time = event["timestamp"]
+                self._last_tick_time = event.timestamp
 
     @property
     def max_uptime(self):
@@ -805,13 +834,16 @@ class DeathAndDecayUptimeAnalyzer(BaseAnalyzer):
 
 
 class FesteringStrikeTracker(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Festering Strike"}
+
     def __init__(self):
         self.one_death_rune_casts = 0
         self.two_death_rune_casts = 0
         self.death_rune_waste_events = []  # For timeline entries
 
     def add_event(self, event):
-        if event["type"] == "cast" and event["ability"] == "Festering Strike":
+        if event.type_code == CAST and event.ability_code == FESTERING_STRIKE:
             # Check rune state before cast
             runes_before = event.get("runes_before", [])
 
@@ -819,13 +851,7 @@ class FesteringStrikeTracker(BaseAnalyzer):
                 return  # Can't analyze without rune state
 
             # Check if player has Bloodlust/Heroism/Time Warp - skip analysis during these periods
-            active_buffs = event.get("buffs", [])
-            has_haste_buff = any(
-                buff["ability"] in ("Bloodlust", "Heroism", "Time Warp")
-                for buff in active_buffs
-            )
-
-            if has_haste_buff:
+            if not MAJOR_HASTE_BUFFS.isdisjoint(event.buff_codes):
                 return  # Don't count FS waste during major haste buffs
 
             # Check what was available before cast
@@ -855,7 +881,7 @@ class FesteringStrikeTracker(BaseAnalyzer):
                     self.two_death_rune_casts += 1
                     self.death_rune_waste_events.append(
                         {
-                            "timestamp": event["timestamp"],
+                            "timestamp": event.timestamp,
                             "type": "death_rune_waste",
                             "ability": "Festering Strike",
                             "death_runes_wasted": 2,
@@ -868,7 +894,7 @@ class FesteringStrikeTracker(BaseAnalyzer):
                     self.one_death_rune_casts += 1
                     self.death_rune_waste_events.append(
                         {
-                            "timestamp": event["timestamp"],
+                            "timestamp": event.timestamp,
                             "type": "death_rune_waste",
                             "ability": "Festering Strike",
                             "death_runes_wasted": 1,
@@ -919,12 +945,13 @@ class GhoulAnalyzer(BaseAnalyzer):
         self._ignore_windows = ignore_windows
 
     def _is_ghoul(self, event):
-        if not event["is_owner_pet_source"] and not event["is_owner_pet_target"]:
+        if not event.is_owner_pet_source and not event.is_owner_pet_target:
             return False
 
-        if event["source"] in ("Army of the Dead", "Ebon Gargoyle") or event[
-            "target"
-        ] in ("Army of the Dead", "Ebon Gargoyle"):
+        if event.source in ("Army of the Dead", "Ebon Gargoyle") or event.target in (
+            "Army of the Dead",
+            "Ebon Gargoyle",
+        ):
             return False
 
         return True
@@ -934,11 +961,11 @@ class GhoulAnalyzer(BaseAnalyzer):
         self._melee_uptime.add_event(event)
 
         # Ghoul was revived
-        if event["type"] == "cast" and event["ability"] == "Raise Dead":
+        if event.type_code == CAST and event.ability_code == RAISE_DEAD:
             # It seems this can happen if the ghoul is dismissed
             if self._window and self._window.end is None:
-                self._window.end = event["timestamp"]
-            self._window = Window(event["timestamp"])
+                self._window.end = event.timestamp
+            self._window = Window(event.timestamp)
             self._windows.append(self._window)
             return
 
@@ -950,19 +977,19 @@ class GhoulAnalyzer(BaseAnalyzer):
             self._window = Window(0)
             self._windows.append(self._window)
 
-        if "Ghoul" in event["source"] and event["type"] == "damage":
-            if event["ability"] == "Claw":
+        if "Ghoul" in event.source and event.type_code == DAMAGE:
+            if event.ability_code == CLAW:
                 self._num_claws += 1
-            elif event["ability"] == "Sweeping Claws":
+            elif event.ability_code == SWEEPING_CLAWS:
                 self._num_sweeping_claws += 1
-            elif event["ability"] == "Gnaw":
+            elif event.ability_code == GNAW:
                 self._num_gnaws += 1
-            elif event["type"] == "damage":
-                self.total_damage += event["amount"]
-        elif event["is_owner_pet_target"]:
+            elif event.type_code == DAMAGE:
+                self.total_damage += event.amount
+        elif event.is_owner_pet_target:
             # Ghoul has died
-            if event["type"] == "damage" and event.get("overkill"):
-                self._window.end = event["timestamp"]
+            if event.type_code == DAMAGE and event.get("overkill"):
+                self._window.end = event.timestamp
 
     @property
     def melee_uptime(self):
@@ -1133,6 +1160,8 @@ class OutbreakSnapshot:
 
 
 class OutbreakSnapshotTracker(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+
     def __init__(self, buff_tracker: BuffTracker, combatant_info):
         self._buff_tracker = buff_tracker
         self._combatant_info = combatant_info
@@ -1140,10 +1169,10 @@ class OutbreakSnapshotTracker(BaseAnalyzer):
 
     def add_event(self, event):
         if (
-            event["type"] == "cast" and event.get("abilityGameID") == 77575
+            event.type_code == CAST and event.get("abilityGameID") == 77575
         ):  # Outbreak spell ID
             snapshot = OutbreakSnapshot(
-                event["timestamp"], self._buff_tracker, self._combatant_info
+                event.timestamp, self._buff_tracker, self._combatant_info
             )
             self._outbreak_snapshots.append(snapshot)
 
@@ -1225,6 +1254,9 @@ class OutbreakSnapshotTracker(BaseAnalyzer):
 
 
 class AMSAnalyzer(BaseAnalyzer):
+    EVENT_TYPES = {"cast"}
+    ABILITIES = {"Anti-Magic Shield"}
+
     def __init__(self, fight_end_time):
         self._num_used = 0
         self._ams_cooldown = 60000
@@ -1237,7 +1269,7 @@ class AMSAnalyzer(BaseAnalyzer):
         )
 
     def add_event(self, event):
-        if event["type"] == "cast" and event["ability"] == "Anti-Magic Shield":
+        if event.type_code == CAST and event.ability_code == ANTI_MAGIC_SHIELD:
             self._num_used += 1
 
     def score(self):
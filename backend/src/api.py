@@ -1,17 +1,27 @@
-import json
 import logging
 import os
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
 
 import sentry_sdk
-from fastapi import FastAPI, Response
+from fastapi import BackgroundTasks, FastAPI, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from sentry_sdk.integrations.aws_lambda import AwsLambdaIntegration
 
 from analysis.analyze import analyze
-from client import PrivateReport, TemporaryUnavailable, fetch_report
+from cache import SingleFlight, is_report_immutable
+from client import (
+    NotFound,
+    PrivateReport,
+    TemporaryUnavailable,
+    WCLClient,
+    fetch_report,
+)
+from report import Event
+from serialization import dumps
 
 SENTRY_ENABLED = os.environ.get("AWS_EXECUTION_ENV") is not None
 if SENTRY_ENABLED:
@@ -21,7 +31,19 @@ if SENTRY_ENABLED:
         attach_stacktrace=True,
         integrations=[AwsLambdaIntegration()],
     )
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The pooled WCL session is created lazily on first use
+    yield
+    await WCLClient.close_shared_session()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Links get shared in Discord, so many people open the same fight at once
+_in_flight_analyses = SingleFlight()
 
 
 async def catch_exceptions_middleware(request, call_next):
@@ -49,8 +71,29 @@ class AnalyzeResponse(BaseModel):
     data: dict
 
 
-async def save_combat_log(report, report_id: str, fight_id: int, source_id: int):
-    """Save combat log data to local JSON file for analysis"""
+class FastJSONResponse(Response):
+    """
+    Renders straight to JSON bytes. Returning one of these from an endpoint skips
+    FastAPI's jsonable_encoder pass, which is slow on large analysis results
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content, default=self._encode)
+
+    @staticmethod
+    def _encode(obj):
+        if isinstance(obj, Event):
+            return obj.to_dict()
+        return jsonable_encoder(obj)
+
+
+def save_combat_log(report, report_id: str, fight_id: int, source_id: int):
+    """
+    Save combat log data to local JSON file for analysis. It runs as a background
+    task once the response is sent, and the events are streamed to the file
+    """
     try:
         # Create logs directory if it doesn't exist (in the backend root)
         logs_dir = Path("../saved_logs")
@@ -75,17 +118,17 @@ async def save_combat_log(report, report_id: str, fight_id: int, source_id: int)
                 "timestamp": timestamp,
                 "end_time": report.end_time,
             },
-            "events": report._events,
-            "combatant_info": report._combatant_info,
-            "fights": report._fights,
-            "abilities": report._abilities,
-            "actors": report._actors,
-            "rankings": report._rankings,
+            **report.archive(),
         }
 
         # Save to file
-        with open(filepath, "w") as f:
-            json.dump(log_data, f, indent=2)
+        with open(filepath, "wb") as f:
+            f.write(b"{")
+            for key, value in log_data.items():
+                f.write(dumps(key) + b":" + dumps(value) + b",")
+            f.write(b'"events":')
+            f.writelines(report.archived_events())
+            f.write(b"}")
 
         logging.info(f"Saved combat log to {filepath}")
 
@@ -94,33 +137,56 @@ async def save_combat_log(report, report_id: str, fight_id: int, source_id: int)
         # Don't let this break the main analysis flow
 
 
-@app.get("/analyze_fight")
+async def _fetch_and_analyze(
+    report_id: str, fight_id: int, source_id: int, background_tasks: BackgroundTasks
+):
+    report = await fetch_report(report_id, fight_id, source_id)
+    events = analyze(report, fight_id)
+
+    # Save the combat log for analysis
+    background_tasks.add_task(save_combat_log, report, report_id, fight_id, source_id)
+
+    return report, events
+
+
+@app.get("/analyze_fight", response_class=FastJSONResponse)
 async def analyze_fight(
-    response: Response, report_id: str, fight_id: int, source_id: int
+    report_id: str, fight_id: int, source_id: int, background_tasks: BackgroundTasks
 ):
     if report_id == "compare":
-        response.status_code = 400
-        return {"error": "Can not analyze while using the 'Compare' feature"}
+        return FastJSONResponse(
+            {"error": "Can not analyze while using the 'Compare' feature"},
+            status_code=400,
+        )
 
     try:
-        report = await fetch_report(report_id, fight_id, source_id)
-
-        # Save the combat log for analysis
-        await save_combat_log(report, report_id, fight_id, source_id)
-
+        report, events = await _in_flight_analyses.do(
+            (report_id, fight_id, source_id),
+            _fetch_and_analyze,
+            report_id,
+            fight_id,
+            source_id,
+            background_tasks,
+        )
     except PrivateReport:
-        response.status_code = 403
-        return {"error": "Can not analyze private reports"}
+        return FastJSONResponse(
+            {"error": "Can not analyze private reports"}, status_code=403
+        )
     except TemporaryUnavailable:
-        response.status_code = 503
-        return {"error": "Bad response from Warcraft Logs, try again"}
-
-    events = analyze(report, fight_id)
+        return FastJSONResponse(
+            {"error": "Bad response from Warcraft Logs, try again"}, status_code=503
+        )
+    except NotFound as e:
+        return FastJSONResponse({"error": str(e)}, status_code=404)
 
     # don't cache reports that are less than a day old
-    ended_ago = datetime.now() - datetime.fromtimestamp(report.end_time / 1000)
-    if fight_id == -1 and ended_ago < timedelta(days=1):
-        response.headers["Cache-Control"] = "no-cache"
+    if fight_id == -1 and not is_report_immutable(report.end_time):
+        cache_control = "no-cache"
     else:
-        response.headers["Cache-Control"] = "max-age=86400"
-    return {"data": events}
+        cache_control = "max-age=86400"
+    return FastJSONResponse({"data": events}, headers={"Cache-Control": cache_control})
+
+
+@app.get("/metrics")
+async def metrics():
+    return WCLClient.metrics()
@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from serialization import dumps, loads
+
+# Reports that ended more than this long ago won't change anymore
+IMMUTABLE_REPORT_AGE = timedelta(days=1)
+
+
+def is_report_immutable(end_time: int):
+    """:param end_time: report end time in ms since the epoch"""
+    ended_ago = datetime.now() - datetime.fromtimestamp(end_time / 1000)
+    return ended_ago >= IMMUTABLE_REPORT_AGE
+
+
+class ResponseCache:
+    """
+    Persistent content-addressed cache for raw WCL responses, keyed by a hash of the query text.
+    Backed by SQLite, evicts least-recently-used entries once the byte-size cap is reached.
+    The file can be shared by several worker processes.
+    SQLite and (de)compression run in a worker thread, to keep multi-MB responses off the event loop
+    """
+
+    # Bumped when the table layout changes, the cache is dropped and recreated
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path, max_bytes):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._db = None
+        # The connection is shared by the worker threads
+        self._lock = threading.Lock()
+        self._disabled = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str):
+        return hashlib.sha256(query.encode()).hexdigest()
+
+    def _connect(self):
+        if self._db is None and not self._disabled:
+            try:
+                db = sqlite3.connect(
+                    self._path, isolation_level=None, check_same_thread=False
+                )
+                db.execute("PRAGMA journal_mode=WAL")
+                if (
+                    db.execute("PRAGMA user_version").fetchone()[0]
+                    < self.SCHEMA_VERSION
+                ):
+                    db.execute("DROP TABLE IF EXISTS responses")
+                    db.execute("DROP TABLE IF EXISTS cache_size")
+                    db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                # value goes last, so reading the other columns doesn't have to walk
+                # the BLOB's overflow pages
+                db.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        size INTEGER NOT NULL,
+                        expires_at REAL,
+                        accessed_at REAL NOT NULL,
+                        value BLOB NOT NULL
+                    )
+                    """)
+                # Covers the eviction scan
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at, size, key)"
+                )
+                # Running total of the entry sizes, kept by triggers so every worker
+                # writing to the file sees the same total without summing the table
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_size (total INTEGER NOT NULL)"
+                )
+                db.execute("""
+                    INSERT INTO cache_size (total)
+                    SELECT (SELECT COALESCE(SUM(size), 0) FROM responses)
+                    WHERE NOT EXISTS (SELECT 1 FROM cache_size)
+                    """)
+                db.execute("""
+                    CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses
+                    BEGIN UPDATE cache_size SET total = total + new.size; END
+                    """)
+                db.execute("""
+                    CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses
+                    BEGIN UPDATE cache_size SET total = total + new.size - old.size; END
+                    """)
+                db.execute("""
+                    CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses
+                    BEGIN UPDATE cache_size SET total = total - old.size; END
+                    """)
+            except sqlite3.Error as e:
+                # Never fail a request because the cache can't be used
+                logging.error(f"Disabling response cache: {e}")
+                self._disabled = True
+            else:
+                self._db = db
+        return self._db
+
+    async def get(self, key):
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key, value, ttl: timedelta | None):
+        """:param ttl: how long the entry is valid for, None if it never expires"""
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def delete(self, key):
+        await asyncio.to_thread(self._delete, key)
+
+    def _get(self, key):
+        try:
+            with self._lock:
+                value = self._read(key)
+            if value is None:
+                self.misses += 1
+                return None
+        except sqlite3.Error as e:
+            # A broken or locked cache is a miss
+            logging.error(f"Reading from the response cache failed: {e}")
+            self.misses += 1
+            return None
+
+        try:
+            value = loads(zlib.decompress(value))
+        except (zlib.error, ValueError) as e:
+            # So is a corrupt entry, which is dropped
+            logging.error(f"Dropping corrupt response cache entry: {e}")
+            self._delete(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def _read(self, key):
+        db = self._connect()
+        if db is None:
+            return None
+
+        now = time.time()
+        row = db.execute(
+            "SELECT expires_at, value FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        expires_at, value = row
+        if expires_at is not None and expires_at < now:
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+
+        db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return value
+
+    def _set(self, key, value, ttl: timedelta | None):
+        data = zlib.compress(dumps(value), 1)
+        if len(data) > self._max_bytes:
+            return
+
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl.total_seconds()
+        try:
+            with self._lock:
+                db = self._connect()
+                if db is None:
+                    return
+
+                # Other workers write to the same file, the write and the eviction
+                # it triggers are done in one go. An upsert rather than INSERT OR
+                # REPLACE, whose implicit delete doesn't fire the delete trigger
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    db.execute(
+                        """
+                        INSERT INTO responses (key, size, expires_at, accessed_at, value)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (key) DO UPDATE SET
+                            size = excluded.size,
+                            expires_at = excluded.expires_at,
+                            accessed_at = excluded.accessed_at,
+                            value = excluded.value
+                        """,
+                        (key, len(data), expires_at, now, data),
+                    )
+                    self._evict(db)
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                db.execute("COMMIT")
+        except sqlite3.Error as e:
+            logging.error(f"Writing to the response cache failed: {e}")
+
+    def _delete(self, key):
+        try:
+            with self._lock:
+                db = self._connect()
+                if db is not None:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logging.error(f"Deleting from the response cache failed: {e}")
+
+    def _evict(self, db):
+        total_size = db.execute("SELECT total FROM cache_size").fetchone()[0]
+        if total_size <= self._max_bytes:
+            return
+
+        # Covered by the accessed_at index, the BLOBs aren't read
+        evict = []
+        for key, size in db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            if total_size <= self._max_bytes:
+                break
+            evict.append((key,))
+            total_size -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class LRUCache:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+
+        value, expires_at = self._entries[key]
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def set(self, key, value, ttl: timedelta):
+        self._entries[key] = (value, time.monotonic() + ttl.total_seconds())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single in-flight call"""
+
+    def __init__(self):
+        self._in_flight = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded so a cancelled caller doesn't cancel the call for everyone else
+        return await asyncio.shield(future)
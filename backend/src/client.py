@@ -1,12 +1,18 @@
 import asyncio.exceptions
+import json
 import logging
 import os
-from datetime import datetime
+import tempfile
+from collections import defaultdict
+from datetime import timedelta
 
 import aiohttp
 import sentry_sdk
 
+from cache import LRUCache, ResponseCache, SingleFlight, is_report_immutable
 from report import Report, Source
+from scheduler import RATE_LIMIT_QUERY, Priority, QueryShed, RequestScheduler
+from serialization import loads
 
 
 class WCLClientException(Exception):
@@ -21,43 +27,136 @@ class TemporaryUnavailable(WCLClientException):
     pass
 
 
-class CacheWithExpiry:
-    def __init__(self):
-        self._cache = {}
+class NotFound(WCLClientException):
+    pass
+
+
+class ReportMetadata:
+    """Parsed report master data, shared by every fight and source of a report"""
 
-    def get(self, key):
-        if key not in self._cache:
-            return None
-        value, expiry = self._cache[key]
-        if expiry < datetime.utcnow():
-            del self._cache[key]
-            return None
-        return value
+    def __init__(self, report_metadata):
+        self.end_time = report_metadata["endTime"]
+        self.actors = report_metadata["masterData"]["actors"]
+        self.abilities = report_metadata["masterData"]["abilities"]
+        self.fights = report_metadata["fights"]
 
-    def set(self, key, value, expiry):
-        self._cache[key] = (value, datetime.utcnow() + expiry)
+        self.actors_by_id = {actor["id"]: actor for actor in self.actors}
+        self.pets_by_owner = defaultdict(set)
+        for actor in self.actors:
+            if actor["type"] == "Pet":
+                self.pets_by_owner[actor["petOwner"]].add(actor["id"])
+        self.fights_by_id = {fight["id"]: fight for fight in self.fights}
+        self.boss_fights = [fight for fight in self.fights if fight["encounterID"] != 0]
+
+    def get_source(self, source_id):
+        actor = self.actors_by_id.get(source_id)
+        if not actor or actor["type"] != "Player":
+            raise NotFound("Character not found")
+
+        return Source(actor["id"], actor["name"], set(self.pets_by_owner[source_id]))
+
+    def get_fight(self, fight_id):
+        if fight_id == -1:
+            if self.boss_fights:
+                return self.boss_fights[-1]
+            if self.fights:
+                return self.fights[-1]
+        elif fight_id in self.fights_by_id:
+            return self.fights_by_id[fight_id]
+        raise NotFound("Fight not found")
+
+    def has(self, fight_id, source_ids):
+        return (fight_id == -1 or fight_id in self.fights_by_id) and all(
+            self.actors_by_id.get(source_id, {}).get("type") == "Player"
+            for source_id in source_ids
+        )
 
 
 class WCLClient:
     base_url = "https://classic.warcraftlogs.com/api/v2/client"
     _auth = None
     _zones = None
-    _cache = CacheWithExpiry()
-
-    def __init__(self, client_id, client_secret):
+    _cache = ResponseCache(
+        os.environ.get(
+            "WCL_CACHE_PATH", os.path.join(tempfile.gettempdir(), "wcl_cache.sqlite")
+        ),
+        max_bytes=int(os.environ.get("WCL_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+    )
+    # Responses for reports that are still being logged to can change
+    RECENT_REPORT_CACHE_TTL = timedelta(minutes=1)
+    # Old reports don't change, they're kept a month unless the size cap evicts them
+    IMMUTABLE_REPORT_CACHE_TTL = timedelta(days=30)
+    # Parsed metadata, users usually click through several fights / sources of the same report
+    _metadata_cache = LRUCache(max_size=64)
+    # Identical queries from concurrent requests (ie. metadata of the same report) share one call
+    _in_flight_queries = SingleFlight()
+    _scheduler = RequestScheduler()
+    # Long-lived session shared by every client in the process (app lifespan / warm lambda container)
+    _shared_session = None
+    _shared_session_loop = None
+
+    MAX_END_TIME = 100000000000
+    # Don't bother slicing fights where a slice would only hold a few seconds of events
+    MIN_SLICE_DURATION_MS = 30000
+
+    def __init__(
+        self,
+        client_id,
+        client_secret,
+        event_slices=4,
+        max_concurrency=4,
+        session: aiohttp.ClientSession | None = None,
+    ):
         self._client_id = client_id
         self._client_secret = client_secret
-        self._session = None
+        self._session = session
+        # Borrowed sessions are owned (and closed) by whoever created them
+        self._owns_session = session is None
+        self._event_slices = event_slices
+        self._max_concurrency = max_concurrency
 
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession()
+        if self._owns_session:
+            self._session = self.create_session()
         return self
 
     async def __aexit__(self, *args):
-        await self._session.__aexit__(*args)
-        self._session = None
-
-    async def _fetch_metadata(self, report_code):
+        if self._owns_session:
+            await self._session.__aexit__(*args)
+            self._session = None
+
+    @staticmethod
+    def create_session():
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            # Everything goes to warcraftlogs.com, allow enough for the sliced event fetches
+            limit_per_host=32,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    @classmethod
+    def get_shared_session(cls):
+        loop = asyncio.get_running_loop()
+        session = cls._shared_session
+        # A session can't be re-used across event loops (ie. when run from asyncio.run)
+        if session is None or session.closed or cls._shared_session_loop is not loop:
+            session = cls.create_session()
+            cls._shared_session = session
+            cls._shared_session_loop = loop
+        return session
+
+    @classmethod
+    async def close_shared_session(cls):
+        session = cls._shared_session
+        cls._shared_session = None
+        cls._shared_session_loop = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _fetch_metadata(self, report_code, refresh=False):
+        """:param refresh: skip the response cache"""
         metadata_query = f"""
 {{
   reportData {{
@@ -92,13 +191,45 @@ class WCLClient:
   }}
 }}
 """
-        return (await self._query(metadata_query, "metadata"))["data"]
+        if refresh:
+            await self._cache.delete(self._cache.key(metadata_query))
+        return (
+            await self._query(
+                metadata_query,
+                "metadata",
+                cache_ttl=lambda response: self._get_cache_ttl(
+                    response["data"]["reportData"]["report"]["endTime"]
+                ),
+            )
+        )["data"]
+
+    def _get_cache_ttl(self, report_end_time):
+        if is_report_immutable(report_end_time):
+            return self.IMMUTABLE_REPORT_CACHE_TTL
+        return self.RECENT_REPORT_CACHE_TTL
+
+    async def _fetch_events(
+        self, report_code, fight, source: Source, cache_ttl: timedelta
+    ):
+        return await self._fetch_fight_data(
+            report_code,
+            fight["id"],
+            cache_ttl,
+            self._fetch_sliced_events(report_code, fight, source, cache_ttl),
+        )
 
-    async def _fetch_events(self, report_code, fight_id, source: Source):
-        deaths = []
-        events = []
-        combatant_info = []
-        next_page_timestamp = 0
+    async def _fetch_events_many(
+        self, report_code, fight, sources: list[Source], cache_ttl: timedelta
+    ):
+        return await self._fetch_fight_data(
+            report_code,
+            fight["id"],
+            cache_ttl,
+            self._fetch_batched_events(report_code, fight["id"], sources, cache_ttl),
+        )
+
+    async def _fetch_fight_data(self, report_code, fight_id, cache_ttl, events_coro):
+        """Fetches the per-fight data shared by all sources alongside the given events fetch"""
         rankings_query = f"""
 {{
     reportData {{
@@ -111,89 +242,305 @@ class WCLClient:
     }}
 }}
 """
+        rankings_task = asyncio.create_task(
+            self._query(
+                rankings_query, "rankings", timeout=1.5, priority=Priority.BACKGROUND
+            )
+        )
+        deaths_task = asyncio.create_task(
+            self._fetch_deaths(report_code, fight_id, cache_ttl)
+        )
+        combatant_info_task = asyncio.create_task(
+            self._fetch_combatant_info(report_code, fight_id, cache_ttl)
+        )
 
-        events_query_t = """
-{
-  reportData {
-    report(code: "%(report_code)s") {
-      events(
+        try:
+            events = await events_coro
+            combatant_info = await combatant_info_task
+            deaths = await deaths_task
+        except BaseException:
+            # Don't leave the other queries running, or their errors unretrieved
+            for task in (rankings_task, deaths_task, combatant_info_task):
+                task.cancel()
+            await asyncio.gather(
+                rankings_task, deaths_task, combatant_info_task, return_exceptions=True
+            )
+            raise
+
+        rankings = []
+
+        try:
+            rankings_result = await rankings_task
+        except asyncio.exceptions.TimeoutError:
+            logging.error("Timeout fetching rankings")
+        except QueryShed:
+            logging.warning("Skipped fetching rankings, WCL point budget is low")
+        else:
+            if (
+                isinstance(rankings_result, dict)
+                and not rankings_result.get("error")
+                and rankings_result["data"]["reportData"]["report"]["rankings"]
+            ):
+                rankings = rankings_result["data"]["reportData"]["report"]["rankings"][
+                    "data"
+                ]
+
+        return events, combatant_info, deaths, rankings
+
+    async def _fetch_sliced_events(
+        self, report_code, fight, source: Source, cache_ttl: timedelta
+    ):
+        slices = self._get_event_slices(fight["startTime"], fight["endTime"])
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        slice_results = await asyncio.gather(
+            *(
+                self._fetch_event_slice(
+                    report_code,
+                    fight["id"],
+                    source,
+                    start_time,
+                    end_time,
+                    semaphore,
+                    cache_ttl,
+                )
+                for start_time, end_time in slices
+            )
+        )
+
+        # Slices are contiguous and each one is time-ordered, so concatenating
+        # them keeps the events in timestamp order
+        return [event for slice_events in slice_results for event in slice_events]
+
+    async def _fetch_batched_events(
+        self, report_code, fight_id, sources: list[Source], cache_ttl: timedelta
+    ):
+        """
+        Fetches the events of several sources with one query per page, using an aliased
+        events block per source. Each alias is paginated independently until exhausted
+        """
+        events_alias_t = """
+      source_%(source_id)s: events(
         startTime: %(next_page_timestamp)s
-        endTime: 100000000000
+        endTime: %(end_time)s
         sourceID: %(source_id)s
         useActorIDs: true
         includeResources: true
         fightIDs: [%(fight_id)s]
+        filterExpression: %(filter_expression)s
         limit: 10000
       ) {
         nextPageTimestamp
         data
       }
-      deaths: events(
+"""
+        events_query_t = """
+{
+  reportData {
+    report(code: "%(report_code)s") {
+      %(aliases)s
+    }
+  }
+}
+"""
+        filter_expressions = {
+            source.id: self._get_events_filter_expression(source) for source in sources
+        }
+        events_by_source = {source.id: [] for source in sources}
+        next_page_timestamps = {source.id: 0 for source in sources}
+
+        while next_page_timestamps:
+            aliases = "".join(
+                events_alias_t
+                % {
+                    "source_id": source_id,
+                    "next_page_timestamp": next_page_timestamp,
+                    "end_time": self.MAX_END_TIME,
+                    "fight_id": fight_id,
+                    "filter_expression": filter_expressions[source_id],
+                }
+                for source_id, next_page_timestamp in next_page_timestamps.items()
+            )
+            events_query = events_query_t % {
+                "report_code": report_code,
+                "aliases": aliases,
+            }
+            r = (
+                await self._query(
+                    events_query,
+                    f"events ({len(next_page_timestamps)} sources)",
+                    cache_ttl=cache_ttl,
+                )
+            )["data"]["reportData"]["report"]
+
+            for source_id in list(next_page_timestamps):
+                source_events = r[f"source_{source_id}"]
+                events_by_source[source_id] += source_events["data"]
+
+                if source_events["nextPageTimestamp"] is None:
+                    del next_page_timestamps[source_id]
+                else:
+                    next_page_timestamps[source_id] = source_events["nextPageTimestamp"]
+
+        return events_by_source
+
+    async def _fetch_deaths(self, report_code, fight_id, cache_ttl: timedelta):
+        # Deaths of both friendly pets (army ghouls) and enemies are used,
+        # the Deaths data type only returns one hostility type at a time
+        deaths_query = f"""
+{{
+  reportData {{
+    report(code: "{report_code}") {{
+      friendlyDeaths: events(
         startTime: 0
-        endTime: 100000000000
+        endTime: {self.MAX_END_TIME}
         useActorIDs: true
-        sourceID: -1
-        fightIDs: [%(fight_id)s]
+        dataType: Deaths
+        hostilityType: Friendlies
+        fightIDs: [{fight_id}]
         limit: 10000
-      ) {
+      ) {{
         data
-      }
-
+      }}
+      enemyDeaths: events(
+        startTime: 0
+        endTime: {self.MAX_END_TIME}
+        useActorIDs: true
+        dataType: Deaths
+        hostilityType: Enemies
+        fightIDs: [{fight_id}]
+        limit: 10000
+      ) {{
+        data
+      }}
+    }}
+  }}
+}}
+"""
+        r = (await self._query(deaths_query, "deaths", cache_ttl=cache_ttl))["data"][
+            "reportData"
+        ]["report"]
+        return [
+            death
+            for death in r["friendlyDeaths"]["data"] + r["enemyDeaths"]["data"]
+            if death["type"] == "death"
+        ]
+
+    async def _fetch_combatant_info(self, report_code, fight_id, cache_ttl: timedelta):
+        combatant_info_query = f"""
+{{
+  reportData {{
+    report(code: "{report_code}") {{
       combatantInfo: events(
         startTime: 0
-        endTime: 100000000000
+        endTime: {self.MAX_END_TIME}
         useActorIDs: true
         dataType: CombatantInfo
+        fightIDs: [{fight_id}]
+        limit: 10000
+      ) {{
+        data
+      }}
+    }}
+  }}
+}}
+"""
+        r = (
+            await self._query(
+                combatant_info_query, "combatant_info", cache_ttl=cache_ttl
+            )
+        )["data"]["reportData"]["report"]
+        return r["combatantInfo"]["data"]
+
+    def _get_event_slices(self, fight_start_time, fight_end_time):
+        """
+        Split the fight into contiguous [start, end) ranges that can be fetched concurrently.
+        The outer bounds are left open so nothing outside the fight's own
+        start/end (ie. prepull events) is lost compared to a single paged fetch
+        """
+        num_slices = max(1, self._event_slices)
+        slice_duration = (fight_end_time - fight_start_time) // num_slices
+
+        if slice_duration < self.MIN_SLICE_DURATION_MS:
+            return [(0, self.MAX_END_TIME)]
+
+        boundaries = [
+            fight_start_time + slice_duration * i for i in range(1, num_slices)
+        ]
+        starts = [0] + boundaries
+        ends = boundaries + [self.MAX_END_TIME]
+        return list(zip(starts, ends, strict=True))
+
+    @staticmethod
+    def _get_events_filter_expression(source: Source):
+        """
+        WCL filter expression (as a GraphQL string literal) with report.EventFilter's
+        actor rule. The event type rules aren't applied here: the fight's stages read
+        runic power from those events before the filter drops them
+        """
+        actor_ids = ", ".join(
+            str(actor_id) for actor_id in sorted({source.id} | source.pets)
+        )
+        expression = f"source.id in ({actor_ids}) or target.id in ({actor_ids})"
+        return json.dumps(expression)
+
+    async def _fetch_event_slice(
+        self,
+        report_code,
+        fight_id,
+        source: Source,
+        start_time,
+        end_time,
+        semaphore,
+        cache_ttl: timedelta,
+    ):
+        events = []
+        next_page_timestamp = start_time
+        filter_expression = self._get_events_filter_expression(source)
+
+        events_query_t = """
+{
+  reportData {
+    report(code: "%(report_code)s") {
+      events(
+        startTime: %(next_page_timestamp)s
+        endTime: %(end_time)s
+        sourceID: %(source_id)s
+        useActorIDs: true
+        includeResources: true
         fightIDs: [%(fight_id)s]
+        filterExpression: %(filter_expression)s
         limit: 10000
       ) {
+        nextPageTimestamp
         data
       }
     }
   }
 }
 """
-        rankings_task = asyncio.create_task(
-            self._query(rankings_query, "rankings", timeout=1.5)
-        )
-
-        while next_page_timestamp is not None:
+        while next_page_timestamp is not None and next_page_timestamp < end_time:
             events_query = events_query_t % {
                 "report_code": report_code,
                 "next_page_timestamp": next_page_timestamp,
+                "end_time": end_time,
                 "source_id": source.id,
                 "fight_id": fight_id,
+                "filter_expression": filter_expression,
             }
-            r = (await self._query(events_query, "events"))["data"]["reportData"][
-                "report"
-            ]
-
-            if next_page_timestamp == 0:
-                combatant_info = r["combatantInfo"]["data"]
-                deaths = [
-                    death for death in r["deaths"]["data"] if death["type"] == "death"
-                ]
+            async with semaphore:
+                r = (await self._query(events_query, "events", cache_ttl=cache_ttl))[
+                    "data"
+                ]["reportData"]["report"]
 
             next_page_timestamp = r["events"]["nextPageTimestamp"]
             events += r["events"]["data"]
 
-        rankings = []
+        # Events sitting exactly on the boundary can be returned by both slices,
+        # the next slice owns them
+        if end_time != self.MAX_END_TIME:
+            events = [event for event in events if event["timestamp"] < end_time]
 
-        try:
-            rankings_result = await rankings_task
-        except asyncio.exceptions.TimeoutError:
-            logging.error("Timeout fetching rankings")
-        else:
-            if (
-                isinstance(rankings_result, dict)
-                and not rankings_result.get("error")
-                and rankings_result["data"]["reportData"]["report"]["rankings"]
-            ):
-                rankings = rankings_result["data"]["reportData"]["report"]["rankings"][
-                    "data"
-                ]
-
-        return events, combatant_info, deaths, rankings
+        return events
 
     async def _get_zones(self):
         if not self._zones:
@@ -215,44 +562,65 @@ class WCLClient:
             self.__class__._zones = zones
         return self._zones
 
-    async def query(self, report_id, fight_id, source_id):
-        zones = await self._get_zones()
-        encounters = [encounter for zone in zones for encounter in zone["encounters"]]
-        metadata = await self._fetch_metadata(report_id)
-        report_metadata = metadata["reportData"]["report"]
-        actors = report_metadata["masterData"]["actors"]
-
-        if actors is None:
+    async def _get_report_metadata(
+        self, report_code, refresh=False
+    ) -> tuple[ReportMetadata, bool]:
+        """
+        :param refresh: skip the metadata and response caches
+        :return: metadata, whether it came from the metadata cache
+        """
+        if refresh:
+            self._metadata_cache.delete(report_code)
+
+        metadata = self._metadata_cache.get(report_code)
+        if metadata is not None:
+            return metadata, True
+
+        report_metadata = (await self._fetch_metadata(report_code, refresh))[
+            "reportData"
+        ]["report"]
+
+        if report_metadata["masterData"]["actors"] is None:
             # WCL is not working properly, seen this happen a few times
             logging.warning("WCL returned no actors")
             raise TemporaryUnavailable("WCL returned no actors")
 
-        for actor in actors:
-            if actor["type"] == "Player" and actor["id"] == source_id:
-                source = Source(actor["id"], actor["name"])
-                break
-        else:
-            raise Exception("Character not found")
-
-        # Get pets
-        for actor in actors:
-            if actor["type"] == "Pet" and actor["petOwner"] == source_id:
-                source.pets.add(actor["id"])
+        metadata = ReportMetadata(report_metadata)
+        self._metadata_cache.set(
+            report_code, metadata, self._get_cache_ttl(metadata.end_time)
+        )
+        return metadata, False
+
+    async def _get_fight_metadata(self, report_code, fight_id, source_ids):
+        """
+        Cached metadata of a report that's still being logged to can be missing fights
+        uploaded since, it's refetched once when it doesn't have the fight or a source,
+        or when the latest fight is asked for. Metadata that was just fetched is used as is
+
+        :return: metadata, sources, fight
+        """
+        metadata, is_cached = await self._get_report_metadata(report_code)
+        if (
+            is_cached
+            and not is_report_immutable(metadata.end_time)
+            and (fight_id == -1 or not metadata.has(fight_id, source_ids))
+        ):
+            metadata, _ = await self._get_report_metadata(report_code, refresh=True)
+
+        sources = [metadata.get_source(source_id) for source_id in source_ids]
+        return metadata, sources, metadata.get_fight(fight_id)
 
-        if fight_id == -1:
-            boss_fights = [
-                fight
-                for fight in report_metadata["fights"]
-                if fight["encounterID"] != 0
-            ]
-            if boss_fights:
-                fight_id = boss_fights[-1]["id"]
-            else:
-                fight_id = report_metadata["fights"][-1]["id"]
+    async def query(self, report_id, fight_id, source_id):
+        zones = await self._get_zones()
+        encounters = [encounter for zone in zones for encounter in zone["encounters"]]
+        metadata, (source,), fight = await self._get_fight_metadata(
+            report_id, fight_id, [source_id]
+        )
 
         events, combatant_info, deaths, rankings = await self._fetch_events(
-            report_id, fight_id, source
+            report_id, fight, source, self._get_cache_ttl(metadata.end_time)
         )
+        logging.info(f"WCL response cache: {self._cache.stats()}")
 
         return Report(
             source,
@@ -261,34 +629,127 @@ class WCLClient:
             rankings,
             combatant_info,
             encounters,
-            actors,
-            report_metadata["masterData"]["abilities"],
-            report_metadata["fights"],
-            report_metadata["endTime"],
+            metadata.actors,
+            metadata.abilities,
+            metadata.fights,
+            metadata.end_time,
         )
 
-    async def _query(self, query, description, timeout=3):
-        session = await self.session()
-        with sentry_sdk.start_span(op="http", description=description):
-            r = await session.post(
-                self.base_url,
-                json={"query": query},
-                headers={"Authorization": f"Bearer {self._auth}"},
-                raise_for_status=True,
-                timeout=timeout,
+    async def query_many(self, report_id, fight_id, source_ids) -> dict[int, Report]:
+        """
+        Same as `query` for several sources of one fight at once (ie. every DK in a raid),
+        the metadata, deaths, combatant info and rankings are only fetched once
+        """
+        zones = await self._get_zones()
+        encounters = [encounter for zone in zones for encounter in zone["encounters"]]
+        metadata, sources, fight = await self._get_fight_metadata(
+            report_id, fight_id, source_ids
+        )
+
+        (
+            events_by_source,
+            combatant_info,
+            deaths,
+            rankings,
+        ) = await self._fetch_events_many(
+            report_id, fight, sources, self._get_cache_ttl(metadata.end_time)
+        )
+        logging.info(f"WCL response cache: {self._cache.stats()}")
+
+        return {
+            source.id: Report(
+                source,
+                events_by_source[source.id],
+                deaths,
+                rankings,
+                combatant_info,
+                encounters,
+                metadata.actors,
+                metadata.abilities,
+                metadata.fights,
+                metadata.end_time,
             )
-        json = await r.json()
+            for source in sources
+        }
 
-        if "errors" in json:
-            logging.error(json["errors"])
+    async def _query(
+        self,
+        query,
+        description,
+        timeout=3,
+        cache_ttl=None,
+        priority=Priority.INTERACTIVE,
+    ):
+        """
+        :param cache_ttl: how long to cache the response for, or a function of the response
+            returning it. Responses are not cached if not set (ie. rankings keep changing)
+        :param priority: background queries are shed first when the WCL point budget runs low
+        """
+        return await self._in_flight_queries.do(
+            query, self._do_query, query, description, timeout, cache_ttl, priority
+        )
+
+    async def _do_query(self, query, description, timeout, cache_ttl, priority):
+        cache_key = None
+        if cache_ttl is not None:
+            cache_key = self._cache.key(query)
+            cached = await self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        session = await self.session()
+        # Piggyback the rate limit on every query to keep the point budget up to date
+        rate_limited_query = query.replace("{", "{\n" + RATE_LIMIT_QUERY, 1)
+        attempt = 0
+
+        while True:
+            try:
+                async with self._scheduler.slot(priority):
+                    with sentry_sdk.start_span(op="http", description=description):
+                        r = await session.post(
+                            self.base_url,
+                            json={"query": rate_limited_query},
+                            headers={"Authorization": f"Bearer {self._auth}"},
+                            raise_for_status=True,
+                            timeout=timeout,
+                        )
+                    # Decoded straight from the body, skipping aiohttp's str round-trip
+                    body = loads(await r.read())
+                break
+            except QueryShed:
+                if priority == Priority.BACKGROUND:
+                    raise
+                raise TemporaryUnavailable("WCL point budget exhausted")
+            except aiohttp.ClientResponseError as e:
+                retry_after = (e.headers or {}).get("Retry-After")
+                retry_after = (
+                    int(retry_after) if retry_after and retry_after.isdigit() else None
+                )
+                if not self._scheduler.should_retry(e.status, attempt, retry_after):
+                    if e.status in RequestScheduler.RETRY_STATUSES:
+                        raise TemporaryUnavailable(f"WCL returned {e.status}")
+                    raise
+
+                await self._scheduler.backoff(attempt, retry_after)
+                attempt += 1
+
+        if body.get("data") and "rateLimitData" in body["data"]:
+            self._scheduler.update_rate_limit(body["data"].pop("rateLimitData"))
+
+        if "errors" in body:
+            logging.error(body["errors"])
 
             if (
-                json["errors"][0]["message"]
+                body["errors"][0]["message"]
                 == "You do not have permission to view this report."
             ):
                 raise PrivateReport
+        elif cache_key is not None:
+            if callable(cache_ttl):
+                cache_ttl = cache_ttl(body)
+            await self._cache.set(cache_key, body, cache_ttl)
 
-        return json
+        return body
 
     async def session(self):
         if not self._auth:
@@ -303,16 +764,26 @@ class WCLClient:
             self.__class__._auth = (await r.json())["access_token"]
         return self._session
 
+    @classmethod
+    def metrics(cls):
+        return {
+            "scheduler": cls._scheduler.metrics(),
+            "response_cache": cls._cache.stats(),
+        }
+
 
-def get_client():
+def get_client(session: aiohttp.ClientSession | None = None):
     return WCLClient(
         os.environ["WCL_CLIENT_ID"],
         os.environ["WCL_CLIENT_SECRET"],
+        event_slices=int(os.environ.get("WCL_EVENT_SLICES", 4)),
+        max_concurrency=int(os.environ.get("WCL_MAX_CONCURRENCY", 4)),
+        session=session,
     )
 
 
 async def fetch_report(report_id, fight_id, source_id) -> Report:
-    client = get_client()
+    client = get_client(WCLClient.get_shared_session())
 
     async with client:
         return await client.query(report_id, fight_id, source_id)
@@ -0,0 +1,127 @@
+import numpy as np
+
+from report import EVENT_TYPE_CODES, HIT_TYPES
+
+HIT_TYPE_CODES = {name: code for code, name in HIT_TYPES.items()}
+
+# Fill value for integer fields an event doesn't have
+MISSING = -1
+
+
+class EventRow:
+    """A view of a single event in EventColumns, fields are read as attributes"""
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def __getattr__(self, name):
+        if name == "type":
+            return EVENT_TYPE_CODES.name(self.type_code)
+        return getattr(self._columns, name)[self._index].item()
+
+    def __repr__(self):
+        return f"EventRow({self._index})"
+
+
+class EventColumns:
+    """
+    Columnar copy of a list of events, one NumPy array per field, so analyzers that
+    only need a few fields can work on whole arrays instead of looping over events
+    """
+
+    def __init__(self, events):
+        type_codes = []
+        timestamps = []
+        ability_ids = []
+        source_ids = []
+        target_ids = []
+        amounts = []
+        hit_types = []
+        runic_power = []
+        runic_power_waste = []
+        runic_power_gained_ams = []
+        has_runic_power_gained_ams = []
+        in_dead_zone = []
+
+        for event in events:
+            type_codes.append(event.type_code)
+            timestamps.append(event.timestamp)
+            ability_ids.append(event.get("abilityGameID", MISSING))
+            source_ids.append(event.get("sourceID", MISSING))
+            target_ids.append(event.get("targetID", MISSING))
+            amounts.append(event.get("amount") or 0)
+            hit_types.append(HIT_TYPE_CODES.get(event.get("hitType"), MISSING))
+            runic_power.append(event.get("runic_power") or 0)
+            runic_power_waste.append(event.get("runic_power_waste") or 0)
+            gained_ams = event.get("runic_power_gained_ams")
+            runic_power_gained_ams.append(gained_ams or 0)
+            has_runic_power_gained_ams.append(gained_ams is not None)
+            in_dead_zone.append(bool(event.get("in_dead_zone")))
+
+        self.type_code = np.array(type_codes, dtype=np.int16)
+        self.timestamp = np.array(timestamps, dtype=np.int64)
+        self.abilityGameID = np.array(ability_ids, dtype=np.int64)
+        self.sourceID = np.array(source_ids, dtype=np.int64)
+        self.targetID = np.array(target_ids, dtype=np.int64)
+        self.amount = np.array(amounts, dtype=np.int64)
+        self.hitType = np.array(hit_types, dtype=np.int16)
+        self.runic_power = np.array(runic_power, dtype=np.int64)
+        self.runic_power_waste = np.array(runic_power_waste, dtype=np.int64)
+        self.runic_power_gained_ams = np.array(runic_power_gained_ams, dtype=np.int64)
+        self.has_runic_power_gained_ams = np.array(
+            has_runic_power_gained_ams, dtype=bool
+        )
+        self.in_dead_zone = np.array(in_dead_zone, dtype=bool)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        return EventRow(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield EventRow(self, i)
+
+    def is_type(self, *type_codes):
+        """:return: mask of the events with any of the given type codes"""
+        return np.isin(self.type_code, type_codes)
+
+    def involves(self, actor_id):
+        """:return: mask of the events the actor is the source or target of"""
+        return (self.sourceID == actor_id) | (self.targetID == actor_id)
+
+    def count(self, mask):
+        return int(np.count_nonzero(mask))
+
+    def uptime(self, starts, ends, total_duration):
+        """
+        :param starts: mask of the events that start a window
+        :param ends: mask of the events that end a window, an open window ends at
+            total_duration
+        :return: the fraction of total_duration covered by the windows
+        """
+        if not total_duration:
+            return 0
+
+        # +1 for every start and -1 for every end, in event order
+        deltas = starts.astype(np.int64) - ends.astype(np.int64)
+        depth = np.cumsum(deltas)
+        active = depth > 0
+        if not active.any():
+            return 0
+
+        durations = np.diff(self.timestamp, append=total_duration)
+        return float(durations[active].sum() / total_duration)
+
+    def latency_histogram(self, mask, bin_size=50, max_latency=1000):
+        """
+        :return: (counts, bin edges) of the time between consecutive masked events,
+            latencies above max_latency go in the last bin
+        """
+        latencies = np.diff(self.timestamp[mask])
+        bins = np.arange(0, max_latency + bin_size, bin_size)
+        return np.histogram(np.clip(latencies, 0, max_latency), bins=bins)
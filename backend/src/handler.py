@@ -2,4 +2,6 @@ from mangum import Mangum
 
 from api import app
 
-handler = Mangum(app)
+# Mangum runs the lifespan on every invocation, which would close the pooled
+# WCL session, so keep it alive for as long as the container is warm instead
+handler = Mangum(app, lifespan="off")
@@ -1,6 +1,12 @@
 import itertools
 import logging
+import zlib
+from collections import defaultdict, deque
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from serialization import dumps
 
 
 @dataclass
@@ -42,6 +48,107 @@ CRIT_EVENTS = {"CRIT", "BLOCKED_CRIT", "RESIST_PARTIAL_CRIT"}
 
 NO_RUNES = {"Blood": 0, "Frost": 0, "Unholy": 0}
 
+# Event filtering rules, applied server-side by the client and again by the analyzer
+# Events that are never analyzed or shown
+IGNORED_EVENT_TYPES = {"applydebuffstack"}
+# Buff events only matter if they're on the player or their pets
+BUFF_EVENT_TYPES = {"refreshbuff", "applybuff", "removebuff"}
+
+
+class NameCodes:
+    """
+    Interns names as small integer codes, assigned in the order they're first seen.
+    Events carry the codes of their type and ability next to the names, so the
+    analyzers can match on ints instead of comparing strings. Only the names are
+    ever sent to the client
+    """
+
+    def __init__(self, names=()):
+        self._codes = {}
+        self._names = []
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    def codes(self, names) -> frozenset[int]:
+        return frozenset(self.code(name) for name in names)
+
+    def name(self, code: int) -> str:
+        return self._names[code]
+
+
+EVENT_TYPE_CODES = NameCodes()
+ABILITY_CODES = NameCodes()
+
+CAST = EVENT_TYPE_CODES.code("cast")
+BEGINCAST = EVENT_TYPE_CODES.code("begincast")
+STARTCAST = EVENT_TYPE_CODES.code("startcast")
+DAMAGE = EVENT_TYPE_CODES.code("damage")
+HEAL = EVENT_TYPE_CODES.code("heal")
+SUMMON = EVENT_TYPE_CODES.code("summon")
+RESOURCECHANGE = EVENT_TYPE_CODES.code("resourcechange")
+COMBATANTINFO = EVENT_TYPE_CODES.code("combatantinfo")
+APPLYBUFF = EVENT_TYPE_CODES.code("applybuff")
+REFRESHBUFF = EVENT_TYPE_CODES.code("refreshbuff")
+REMOVEBUFF = EVENT_TYPE_CODES.code("removebuff")
+APPLYBUFFSTACK = EVENT_TYPE_CODES.code("applybuffstack")
+REMOVEBUFFSTACK = EVENT_TYPE_CODES.code("removebuffstack")
+APPLYDEBUFF = EVENT_TYPE_CODES.code("applydebuff")
+REFRESHDEBUFF = EVENT_TYPE_CODES.code("refreshdebuff")
+REMOVEDEBUFF = EVENT_TYPE_CODES.code("removedebuff")
+APPLYDEBUFFSTACK = EVENT_TYPE_CODES.code("applydebuffstack")
+REMOVEDEBUFFSTACK = EVENT_TYPE_CODES.code("removedebuffstack")
+
+# Abilities matched on by Fight, or by more than one analysis module
+OBLITERATE = ABILITY_CODES.code("Obliterate")
+FROST_STRIKE = ABILITY_CODES.code("Frost Strike")
+HOWLING_BLAST = ABILITY_CODES.code("Howling Blast")
+RIME = ABILITY_CODES.code("Rime")
+KILLING_MACHINE = ABILITY_CODES.code("Killing Machine")
+FINGERS_OF_THE_DAMNED = ABILITY_CODES.code("Fingers of the Damned")
+BLOOD_TAP = ABILITY_CODES.code("Blood Tap")
+EMPOWER_RUNE_WEAPON = ABILITY_CODES.code("Empower Rune Weapon")
+ANTI_MAGIC_SHELL = ABILITY_CODES.code("Anti-Magic Shell")
+MELEE = ABILITY_CODES.code("Melee")
+SUMMON_GARGOYLE = ABILITY_CODES.code("Summon Gargoyle")
+GARGOYLE_STRIKE = ABILITY_CODES.code("Gargoyle Strike")
+CLAW = ABILITY_CODES.code("Claw")
+BLOOD_PLAGUE = ABILITY_CODES.code("Blood Plague")
+FROST_FEVER = ABILITY_CODES.code("Frost Fever")
+
+
+class EventFilter:
+    """
+    The event filtering rules for a source: only events the source or its pets are
+    involved in, and no IGNORED_EVENT_TYPES or BUFF_EVENT_TYPES on anyone else.
+    Works on both raw WCL events and normalized ones
+    """
+
+    def __init__(self, source: Source):
+        self._actor_ids = frozenset({source.id} | source.pets)
+
+    def matches(self, event):
+        target_id = event.get("targetID")
+        if (
+            event.get("sourceID") not in self._actor_ids
+            and target_id not in self._actor_ids
+        ):
+            return False
+
+        event_type = event["type"]
+        if event_type in IGNORED_EVENT_TYPES:
+            return False
+        if event_type in BUFF_EVENT_TYPES and target_id not in self._actor_ids:
+            return False
+        return True
+
+
 SPELL_TRANSLATIONS = {
     75176: "Swordguard Embroidery",
     45477: "Icy Touch",
@@ -64,6 +171,242 @@ SPELL_TRANSLATIONS = {
     63560: "Dark Transformation",
 }
 
+# Take precedence over the report's own ability names
+ABILITY_NAME_OVERRIDES = {
+    50842: "Pestilence",
+    51271: "Pillar of Frost",
+    48266: "Blood Presence",
+    48263: "Blood Presence",
+    50475: "Blood Presence",
+    48265: "Unholy Presence",
+    49772: "Unholy Presence",
+    **SPELL_TRANSLATIONS,
+}
+
+# Only used when the report doesn't have the ability
+ABILITY_NAME_FALLBACKS = {
+    53748: "Mighty Strength",
+    48470: "Gift of the Wild",
+    105696: "Flask of Winter's Bite",
+    105693: "Flask of Falling Leaves",
+    20217: "Blessing of Kings",
+    87545: "Well Fed",
+    28878: "Heroic Presence",
+    6562: "Heroic Presence",
+    393387: "Leader of the Pack",
+    24932: "Leader of the Pack",
+}
+
+ABILITY_ICON_OVERRIDES = {
+    48266: "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_bloodpresence.jpg",
+    48263: "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_bloodpresence.jpg",
+    50475: "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_bloodpresence.jpg",
+    48265: "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_unholypresence.jpg",
+    49772: "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_unholypresence.jpg",
+    51271: "https://wow.zamimg.com/images/wow/icons/large/inv_armor_helm_plate_naxxramas_raidwarrior_c_01.jpg",
+    50842: "https://wow.zamimg.com/images/wow/icons/large/spell_shadow_plaguecloud.jpg",
+    60229: "https://wow.zamimg.com/images/wow/icons/large/inv_inscription_tarotgreatness.jpg",
+    63560: "https://wow.zamimg.com/images/wow/icons/large/achievement_boss_festergutrotface.jpg",
+}
+
+ABILITY_ICON_FALLBACKS = {
+    79634: "https://wow.zamimg.com/images/wow/icons/large/inv_potiond_1.jpg",
+    48470: "https://wow.zamimg.com/images/wow/icons/large/spell_nature_giftofthewild.jpg",
+    105696: "https://wow.zamimg.com/images/wow/icons/large/trade_alchemy_potione4.jpg",
+    105693: "https://wow.zamimg.com/images/wow/icons/large/trade_alchemy_potione2.jpg",
+    25898: "https://wow.zamimg.com/images/wow/icons/large/spell_magic_greaterblessingofkings.jpg",
+    **dict.fromkeys(
+        (57371, 57399, 57079, 65414, 57111, 57356, 57294),
+        "https://wow.zamimg.com/images/wow/icons/large/spell_misc_food.jpg",
+    ),
+    24383: "https://wow.zamimg.com/images/wow/icons/large/inv_potion_31.jpg",
+    28878: "https://wow.zamimg.com/images/wow/icons/large/inv_helmet_21.jpg",
+    6562: "https://wow.zamimg.com/images/wow/icons/large/inv_helmet_21.jpg",
+    393387: "https://wow.zamimg.com/images/wow/icons/large/spell_nature_unyeildingstamina.jpg",
+    24932: "https://wow.zamimg.com/images/wow/icons/large/spell_nature_unyeildingstamina.jpg",
+    53762: "https://wow.zamimg.com/images/wow/icons/large/inv_alchemy_elixir_empty.jpg",
+}
+
+
+_UNSET = object()
+
+
+class Event(MutableMapping):
+    """
+    A normalized combat log event.
+    The fields events usually have are stored in slots, anything else goes into an
+    overflow dict. Events can still be used as the dicts they used to be through the
+    mapping interface, where an unset field is a missing key.
+    """
+
+    # Listed explicitly, from Python 3.14 on annotations aren't in the class body namespace
+    _FIELD_NAMES = (
+        # From the WCL event
+        "timestamp",
+        "type",
+        "fight",
+        "sourceID",
+        "sourceInstance",
+        "targetID",
+        "targetInstance",
+        "abilityGameID",
+        "hitType",
+        "amount",
+        "overkill",
+        "absorbed",
+        "mitigated",
+        "unmitigatedAmount",
+        "tick",
+        "stack",
+        "classResources",
+        "resourceChange",
+        "resourceChangeType",
+        "otherResourceChange",
+        "resourceActor",
+        "sourceMarker",
+        "targetMarker",
+        "waste",
+        "hitPoints",
+        "maxHitPoints",
+        "attackPower",
+        "spellPower",
+        "armor",
+        "absorb",
+        "itemLevel",
+        "x",
+        "y",
+        "facing",
+        "mapID",
+        # Added by Fight
+        "ability",
+        "ability_icon",
+        "ability_type",
+        "source",
+        "source_is_boss",
+        "source_dies_at",
+        "is_owner_pet_source",
+        "target",
+        "target_is_boss",
+        "target_dies_at",
+        "is_owner_pet_target",
+        "is_miss",
+        "is_crit",
+        "hit_type",
+        "num_targets",
+        "rune_cost",
+        "runes_used",
+        "modifies_runes",
+        "runic_power",
+        "runic_power_cost",
+        "runic_power_waste",
+        "runic_power_gained_ams",
+        "consumes_km",
+        "consumes_rime",
+        # Added by the analyzers
+        "buffs",
+        "debuffs",
+        "runes",
+        "runes_before",
+        "rune_spend_error",
+        "rune_spend_adjustment",
+        "has_gcd",
+        "gcd_offset",
+        "in_dead_zone",
+        "recent_dead_zone",
+        "disease_duration",
+        "blood_charges",
+        "is_core_cast",
+        "bad_howling_blast",
+    )
+
+    # The codes aren't fields, so they're never serialized, see NameCodes.
+    # buff_codes are the ability codes of the buffs, set alongside them
+    __slots__ = (
+        *_FIELD_NAMES,
+        "type_code",
+        "ability_code",
+        "buff_codes",
+        "_extra",
+    )
+    _FIELDS = frozenset(_FIELD_NAMES)
+    _SLOT_NAMES = (*_FIELD_NAMES, "type_code", "ability_code", "buff_codes")
+
+    def __init__(self, fields=None):
+        self._extra = None
+        if fields:
+            for key, value in fields.items():
+                if key in self._FIELDS:
+                    setattr(self, key, value)
+                else:
+                    self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._FIELDS:
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        if key in self._FIELDS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key in self._FIELD_NAMES:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        if key in self._FIELDS:
+            return getattr(self, key, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def to_dict(self):
+        return {key: self[key] for key in self}
+
+    def copy(self):
+        """:return: a shallow copy of the event, codes included"""
+        event = Event.__new__(Event)
+        for key in self._SLOT_NAMES:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                setattr(event, key, value)
+        event._extra = None if self._extra is None else dict(self._extra)
+        return event
+
+    def __repr__(self):
+        return f"Event({self.to_dict()})"
+
 
 class Report:
     def __init__(
@@ -80,7 +423,16 @@ class Report:
         end_time,
     ):
         self.source = source
-        self._events = events
+        # The raw events are handed over to their Fight when it's built, and dropped
+        # as it normalizes them. Only a compressed copy is kept, see archived_events
+        self._events_by_fight = defaultdict(deque)
+        for event in events:
+            self._events_by_fight[event["fight"]].append(event)
+        self._archive_compressor = zlib.compressobj(1)
+        self._archived_event_chunks = []
+        self._num_archived_events = 0
+        # Fights are built on first access, see get_fight
+        self._built_fights = {}
         self._deaths = {
             (death["targetID"], death.get("targetInstance")): death for death in deaths
         }
@@ -92,6 +444,32 @@ class Report:
         }
         self._actors = {actor["id"]: actor for actor in actors}
         self._abilities = abilities
+        # Resolved once per report, events look abilities up by gameID.
+        # If a gameID is listed more than once, the first entry wins
+        abilities_by_id = {
+            ability["gameID"]: ability for ability in reversed(abilities)
+        }
+        self._ability_names = {
+            **ABILITY_NAME_FALLBACKS,
+            **{
+                ability_id: ability["name"]
+                for ability_id, ability in abilities_by_id.items()
+            },
+            **ABILITY_NAME_OVERRIDES,
+        }
+        self._ability_icons = {
+            **ABILITY_ICON_FALLBACKS,
+            **{
+                ability_id: f'https://wow.zamimg.com/images/wow/icons/large/{ability["icon"]}'
+                for ability_id, ability in abilities_by_id.items()
+            },
+            **ABILITY_ICON_OVERRIDES,
+        }
+        self._ability_icon_refs = {}
+        self._ability_types = {
+            ability_id: ability["type"]
+            for ability_id, ability in abilities_by_id.items()
+        }
         self._fights = {fight["id"]: fight for fight in fights}
         self.end_time = end_time
 
@@ -129,9 +507,18 @@ class Report:
         return ret
 
     def get_fight(self, fight_id):
+        """
+        A fight is built once, and the same Fight is returned after that. Its events
+        are read-only, analyses decorate their own copies of them
+        """
         if fight_id == -1:
             fight_id = self._last_fight["id"]
 
+        if fight_id not in self._built_fights:
+            self._built_fights[fight_id] = self._build_fight(fight_id)
+        return self._built_fights[fight_id]
+
+    def _build_fight(self, fight_id):
         fight = self._fights[fight_id]
         combatant_info = [c for c in self._combatant_info if c["fight"] == fight["id"]]
 
@@ -155,12 +542,61 @@ class Report:
             encounter,
             fight["startTime"],
             fight["endTime"],
-            [event for event in self._events if fight["id"] == event["fight"]],
+            self._drain_fight_events(fight["id"]),
             fight_rankings,
             combatant_info,
             fight["hardModeLevel"],
+            EventFilter(self.source),
         )
 
+    def _drain_fight_events(self, fight_id):
+        """
+        Yields the fight's raw events, dropping each one so it can be freed once it's
+        normalized. They're archived compressed first
+        """
+        events = self._events_by_fight.pop(fight_id, deque())
+        while events:
+            event = events.popleft()
+            separator = b"," if self._num_archived_events else b""
+            chunk = self._archive_compressor.compress(separator + dumps(event))
+            if chunk:
+                self._archived_event_chunks.append(chunk)
+            self._num_archived_events += 1
+            yield event
+
+    def archive(self):
+        """
+        :return: the WCL data the report was built from, to be saved with dumps.
+            The events aren't included, see archived_events
+        """
+        return {
+            "combatant_info": self._combatant_info,
+            "fights": self._fights,
+            "abilities": self._abilities,
+            "actors": self._actors,
+            "rankings": self._rankings,
+        }
+
+    def archived_events(self):
+        """
+        Yields the raw events the report was built from as a serialized JSON array, in
+        chunks. The events of built fights are streamed from their compressed copy
+        """
+        yield b"["
+        decompressor = zlib.decompressobj()
+        for chunk in self._archived_event_chunks:
+            yield decompressor.decompress(chunk)
+        # A copy is flushed, so more fights can still be built and archived after this
+        yield decompressor.decompress(self._archive_compressor.copy().flush())
+        yield decompressor.flush()
+
+        separator = b"," if self._num_archived_events else b""
+        for events in self._events_by_fight.values():
+            for event in events:
+                yield separator + dumps(event)
+                separator = b","
+        yield b"]"
+
     def get_actor_name(self, actor_id: int):
         return self._actors[actor_id]["name"]
 
@@ -175,98 +611,74 @@ class Report:
         return self._deaths.get(key, {}).get("timestamp")
 
     def get_ability_name(self, ability_id: int):
-        if ability_id in SPELL_TRANSLATIONS:
-            return SPELL_TRANSLATIONS[ability_id]
-
-        if ability_id == 50842:
-            return "Pestilence"
-        if ability_id == 51271:
-            return "Pillar of Frost"
-        if ability_id in (48266, 48263, 50475):
-            return "Blood Presence"
-        if ability_id in (48265, 49772):
-            return "Unholy Presence"
-        if ability_id == 48263:
-            return "Frost Presence"
-        for ability in self._abilities:
-            if ability["gameID"] == ability_id:
-                return ability["name"]
-        else:
-            if ability_id == 53748:
-                return "Mighty Strength"
-            if ability_id == 48470:
-                return "Gift of the Wild"
-            if ability_id == 105696:
-                return "Flask of Winter's Bite"
-            if ability_id == 105693:
-                return "Flask of Falling Leaves"
-            if ability_id == 20217:
-                return "Blessing of Kings"
-            if ability_id == 87545:
-                return "Well Fed"
-            if ability_id in (28878, 6562):
-                return "Heroic Presence"
-            if ability_id in (393387, 24932):
-                return "Leader of the Pack"
+        name = self._ability_names.get(ability_id)
+        if name is None:
             logging.warning(f"No ability name found for id: {ability_id}")
             return "Unknown"
+        return name
 
     def get_ability_icon(self, ability_id: int):
-        if ability_id in (48266, 48263, 50475):
-            return "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_bloodpresence.jpg"
-        if ability_id in (48265, 49772):
-            return "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_unholypresence.jpg"
-        if ability_id == 48263:
-            return "https://wow.zamimg.com/images/wow/icons/large/spell_deathknight_frostpresence.jpg"
-        if ability_id == 51271:
-            return "https://wow.zamimg.com/images/wow/icons/large/inv_armor_helm_plate_naxxramas_raidwarrior_c_01.jpg"
-        if ability_id == 50842:
-            return "https://wow.zamimg.com/images/wow/icons/large/spell_shadow_plaguecloud.jpg"
-        if ability_id == 60229:
-            return "https://wow.zamimg.com/images/wow/icons/large/inv_inscription_tarotgreatness.jpg"
-        if ability_id == 63560:
-            return "https://wow.zamimg.com/images/wow/icons/large/achievement_boss_festergutrotface.jpg"
-
-        for ability in self._abilities:
-            if ability["gameID"] == ability_id:
-                return (
-                    f'https://wow.zamimg.com/images/wow/icons/large/{ability["icon"]}'
-                )
-        else:
-            if ability_id == 79634:
-                return "https://wow.zamimg.com/images/wow/icons/large/inv_potiond_1.jpg"
-            if ability_id == 48470:
-                return "https://wow.zamimg.com/images/wow/icons/large/spell_nature_giftofthewild.jpg"
-            if ability_id == 105696:
-                return "https://wow.zamimg.com/images/wow/icons/large/trade_alchemy_potione4.jpg"
-            if ability_id == 105693:
-                return "https://wow.zamimg.com/images/wow/icons/large/trade_alchemy_potione2.jpg"
-            if ability_id == 25898:
-                return "https://wow.zamimg.com/images/wow/icons/large/spell_magic_greaterblessingofkings.jpg"
-            if ability_id in (57371, 57399, 57079, 65414, 57111, 57356, 57294):
-                return (
-                    "https://wow.zamimg.com/images/wow/icons/large/spell_misc_food.jpg"
-                )
-            if ability_id == 24383:
-                return "https://wow.zamimg.com/images/wow/icons/large/inv_potion_31.jpg"
-            if ability_id in (28878, 6562):
-                return "https://wow.zamimg.com/images/wow/icons/large/inv_helmet_21.jpg"
-            if ability_id in (393387, 24932):
-                return "https://wow.zamimg.com/images/wow/icons/large/spell_nature_unyeildingstamina.jpg"
-            if ability_id == 53762:
-                return "https://wow.zamimg.com/images/wow/icons/large/inv_alchemy_elixir_empty.jpg"
+        icon = self._ability_icons.get(ability_id)
+        if icon is None:
             logging.warning(f"No ability icon found for id: {ability_id}")
             return "https://wow.zamimg.com/images/wow/icons/large/trade_engineering.jpg"
+        return icon
+
+    def get_ability_icon_ref(self, ability_id: int):
+        """The icon as events reference it, shared between every event of the ability"""
+        if ability_id not in self._ability_icon_refs:
+            self._ability_icon_refs[ability_id] = (self.get_ability_icon(ability_id),)
+        return self._ability_icon_refs[ability_id]
 
     def get_ability_type(self, ability_id: int):
-        for ability in self._abilities:
-            if ability["gameID"] == ability_id:
-                return int(ability["type"])
-        else:
+        if ability_id not in self._ability_types:
             raise Exception(f"No ability type found for id: {ability_id}")
+        return int(self._ability_types[ability_id])
+
+
+class EventLookahead:
+    """
+    Buffers a stream of events so a pipeline stage can look at the events after the
+    one it's processing. Events are only pulled from the stream as far ahead as
+    they're looked at, and are dropped once the stage has moved past them
+    """
+
+    def __init__(self, events):
+        self._events = iter(events)
+        self._buffer = deque()
+        # Index in the stream of the first buffered event
+        self._start = 0
+
+    def get(self, index):
+        """:return: the event at the given index in the stream, None past the end"""
+        while index - self._start >= len(self._buffer):
+            event = next(self._events, None)
+            if event is None:
+                return None
+            self._buffer.append(event)
+        return self._buffer[index - self._start]
+
+    def following(self, index):
+        """Iterates over the events after the one at the given index"""
+        index += 1
+        while (event := self.get(index)) is not None:
+            yield event
+            index += 1
+
+    def __iter__(self):
+        """Iterates over (index, event) pairs"""
+        while (event := self.get(self._start)) is not None:
+            yield self._start, event
+            self._buffer.popleft()
+            self._start += 1
 
 
 class Fight:
+    # Extra normalization stages for specific encounters, run after the common ones
+    ENCOUNTER_STAGES = {
+        "Razorscale": ("_fix_razorscale",),
+    }
+
     def __init__(
         self,
         report: Report,
@@ -278,6 +690,7 @@ class Fight:
         rankings,
         combatant_info,
         hard_mode_level,
+        event_filter: EventFilter | None = None,
     ):
         self._fight_id = fight_id
         self._report = report
@@ -288,17 +701,21 @@ class Fight:
         self.end_time = end_time - start_time
         self.duration = self.end_time - self.start_time
         self._combatant_info_lookup = {c["sourceID"]: c for c in combatant_info}
+        self._decorated_combatant_info = {}
         self.rankings = rankings
         self._hard_mode_level = hard_mode_level
 
-        self.events = [self._normalize_event(event) for event in events]
-        self._fix_cotg()
-        self._add_rp()
-        self.events = self._coalesce()
-        self._add_proc_consumption()
-
-        if encounter.name == "Razorscale":
-            self.events = self._fix_razorscale()
+        # Events stream through every stage once, see EventLookahead
+        events = (self._normalize_event(event) for event in events)
+        for stage in self._get_stages():
+            events = stage(events)
+        # The stages need the events that are filtered out: RP is carried over from
+        # and looked ahead for on any event with class resources (e.g. debuff stacks,
+        # or buffs the source puts on others). Only what's left is kept and analyzed
+        if event_filter is not None:
+            events = (event for event in events if event_filter.matches(event))
+        # Read-only from here on, the fight is shared, see Report.get_fight
+        self.events = list(events)
 
     @property
     def source(self):
@@ -311,41 +728,80 @@ class Fight:
         return self._hard_mode_level > 0
 
     def get_combatant_info(self, source_id: int):
+        """
+        :return: the source's combatant info with aura names and icons and gear icons
+            resolved. It's only built once per source and shared between callers, so
+            it's read-only
+        """
+        if source_id not in self._decorated_combatant_info:
+            self._decorated_combatant_info[source_id] = self._decorate_combatant_info(
+                source_id
+            )
+        return self._decorated_combatant_info[source_id]
+
+    def _decorate_combatant_info(self, source_id: int):
         # It's possible there's no combatant info sometimes (WCL bug?)
         if source_id not in self._combatant_info_lookup:
-            return {}
+            return MappingProxyType({})
 
         combatant_info = self._combatant_info_lookup[source_id]
-        for aura in combatant_info["auras"]:
-            aura["name"] = self._report.get_ability_name(aura["ability"])
-            aura["ability_icon"] = self._report.get_ability_icon(aura["ability"])
-
-        for gear in combatant_info["gear"]:
-            gear["item_icon"] = (
-                f"https://wow.zamimg.com/images/wow/icons/large/{gear['icon']}"
+        auras = tuple(
+            MappingProxyType(
+                {
+                    **aura,
+                    "name": self._report.get_ability_name(aura["ability"]),
+                    "ability_icon": self._report.get_ability_icon(aura["ability"]),
+                }
             )
-
-        return combatant_info
-
-    def _fix_razorscale(self):
-        for event in self.events:
+            for aura in combatant_info["auras"]
+        )
+        gear = tuple(
+            MappingProxyType(
+                {
+                    **item,
+                    "item_icon": f"https://wow.zamimg.com/images/wow/icons/large/{item['icon']}",
+                }
+            )
+            for item in combatant_info["gear"]
+        )
+        return MappingProxyType({**combatant_info, "auras": auras, "gear": gear})
+
+    def _get_stages(self):
+        """Each stage takes a stream of events and yields the processed events"""
+        return [
+            self._fix_cotg,
+            self._add_rp,
+            self._coalesce,
+            self._add_proc_consumption,
+            *(
+                getattr(self, stage)
+                for stage in self.ENCOUNTER_STAGES.get(self.encounter.name, ())
+            ),
+        ]
+
+    def _fix_razorscale(self, events):
+        # Everything up to the first Razorscale event has to be held back, since
+        # earlier events with the same timestamp are kept
+        skipped_events = []
+        for event in events:
+            skipped_events.append(event)
             if event.get("target") == "Razorscale":
-                first_razorscale_event = event["timestamp"]
+                first_razorscale_event = event.timestamp
                 break
         else:
-            return []
-
-        filtered_events = []
-
-        for event in self.events:
-            if event["timestamp"] >= first_razorscale_event:
-                event["timestamp"] -= first_razorscale_event
-                filtered_events.append(event)
-        self.duration = filtered_events[-1]["timestamp"]
+            return
 
-        return filtered_events
-
-    def _add_proc_consumption(self):
+        last_event = None
+        for event in itertools.chain(skipped_events, events):
+            if event.timestamp >= first_razorscale_event:
+                event.timestamp -= first_razorscale_event
+                last_event = event
+                yield event
+        # Keep the original duration if nothing was left
+        if last_event is not None:
+            self.duration = last_event.timestamp
+
+    def _add_proc_consumption(self, events):
         auras = self.get_combatant_info(self.source.id).get("auras", [])
         has_rime = False
         has_km = False
@@ -357,27 +813,28 @@ class Fight:
             elif name == "Killing Machine":
                 has_km = True
 
-        for event in self.events:
-            if event["type"] in ("applybuff", "refreshbuff", "removebuff"):
-                if event["ability"] == "Rime":
-                    has_rime = event["type"] != "removebuff"
-                if event["ability"] == "Killing Machine":
-                    has_km = event["type"] != "removebuff"
+        for event in events:
+            if event.type_code in (APPLYBUFF, REFRESHBUFF, REMOVEBUFF):
+                if event.ability_code == RIME:
+                    has_rime = event.type_code != REMOVEBUFF
+                if event.ability_code == KILLING_MACHINE:
+                    has_km = event.type_code != REMOVEBUFF
 
-            if event["type"] == "cast":
-                event["consumes_km"] = False
-                event["consumes_rime"] = False
+            if event.type_code == CAST:
+                event.consumes_km = False
+                event.consumes_rime = False
 
-            if event["type"] == "cast" and event["ability"] in (
-                "Frost Strike",
-                "Howling Blast",
+            if event.type_code == CAST and event.ability_code in (
+                FROST_STRIKE,
+                HOWLING_BLAST,
             ):
-                if has_rime and event["ability"] == "Howling Blast":
-                    event["consumes_rime"] = True
+                if has_rime and event.ability_code == HOWLING_BLAST:
+                    event.consumes_rime = True
                 if has_km:
-                    event["consumes_km"] = True
+                    event.consumes_km = True
+            yield event
 
-    def _fix_cotg(self):
+    def _fix_cotg(self, events):
         """
         WOW combat log is not correctly emitting events for curse of the grave
         the advanced combat log eventually (after a few events, usually) updates
@@ -388,72 +845,102 @@ class Fight:
 
         def _update_waste(event):
             if "runic_power_waste" not in event:
-                event["runic_power_waste"] = 0
+                event.runic_power_waste = 0
 
-            event["runic_power_waste"] += max(0, event["runic_power"] - 1300)
-            event["runic_power"] = min(1300, event["runic_power"])
+            event.runic_power_waste += max(0, event.runic_power - 1300)
+            event.runic_power = min(1300, event.runic_power)
 
-        for i, event in enumerate(self.events):
+        lookahead = EventLookahead(events)
+        for i, event in lookahead:
             if (
-                event["type"] == "resourcechange"
-                and event["ability"] == "Obliterate"
-                and event["resourceChangeType"] == 6
+                event.type_code == RESOURCECHANGE
+                and event.ability_code == OBLITERATE
+                and event.resourceChangeType == 6
             ):
-                stated_rp = event["runic_power"]
-                event["runic_power"] += 50
+                stated_rp = event.runic_power
+                event.runic_power += 50
                 _update_waste(event)
 
-                for next_event in self.events[i + 1 :]:  # noqa
+                for next_event in lookahead.following(i):
                     # Need a higher threshold here, it can take a while
-                    if next_event["timestamp"] - event["timestamp"] > 500:
+                    if next_event.timestamp - event.timestamp > 500:
                         break
 
                     if "runic_power" in event:
                         if next_event.get("runic_power") == stated_rp:
-                            next_event["runic_power"] += 50
+                            next_event.runic_power += 50
                             # Only add to the waste if it's not already over cap
                             if next_event[
                                 "type"
                             ] == "resourcechange" and not next_event.get(
                                 "runic_power_waste"
                             ):
-                                next_event["runic_power_waste"] = max(
-                                    0, next_event["runic_power"] - 1300
+                                next_event.runic_power_waste = max(
+                                    0, next_event.runic_power - 1300
                                 )
-                            next_event["runic_power"] = min(
-                                1300, next_event["runic_power"]
-                            )
+                            next_event.runic_power = min(1300, next_event.runic_power)
+            yield event
 
-    def _add_rp(self):
+    def _add_rp(self, events):
         last_event = None
 
-        for event in self.events:
+        for event in events:
             if not event.get("runic_power"):
-                runic_power = last_event["runic_power"] if last_event else 0
-                event["runic_power"] = runic_power
+                runic_power = last_event["runic_power"] if last_event is not None else 0
+                event.runic_power = runic_power
             last_event = event
+            yield event
 
-    def _coalesce(self):
+    def _coalesce(self, events):
         """
         Merge multiple events into each other in two cases:
         - Damage events to their respective cast event to detect misses
         - RP events to their respective cast event to track RP gains / losses
-        """
-        events = []
 
-        for i, event in enumerate(self.events):
+        Events are in timestamp order, so every lookahead is a bounded scan forward
+        from the cast. Only the cast itself is modified, the events after it are
+        still untouched when it's coalesced
+        """
+        lookahead = EventLookahead(events)
+        # The last RP change found, as (index it was searched from, index of the change).
+        # The change is None if the RP doesn't change again
+        rp_change = (-1, -1)
+
+        def _next_rp_change(index):
+            """:return: index of the first event after index with different RP, or None"""
+            nonlocal rp_change
+
+            searched_from, change = rp_change
+            # Every event from searched_from up to the change has the same RP
+            if searched_from <= index and (change is None or index < change):
+                return change
+
+            runic_power = lookahead.get(index).runic_power
+            change = index + 1
+            while (next_event := lookahead.get(change)) is not None:
+                if next_event.runic_power != runic_power:
+                    break
+                change += 1
+            else:
+                change = None
+            rp_change = (index, change)
+            return change
+
+        for i, event in lookahead:
             extra = {}
 
-            if event["type"] == "cast":
+            if event.type_code == CAST:
                 # Check if we're actually hitting a target
                 if event["targetID"] != -1:
                     event["num_targets"] = 1
                     # Go through subsequent events to coalesce miss into this event
-                    for next_event in self.events[i + 1 :]:  # noqa
+                    for next_event in lookahead.following(i):
+                        if next_event.timestamp - event.timestamp >= 100:
+                            break
+
                         if (
-                            next_event["type"] == "damage"
+                            next_event.type_code == DAMAGE
                             and next_event["abilityGameID"] == event["abilityGameID"]
-                            and abs(next_event["timestamp"] - event["timestamp"]) < 100
                             and next_event.get("sourceInstance")
                             == event.get("sourceInstance")
                         ):
@@ -467,27 +954,27 @@ class Fight:
                         extra.update(is_miss=False, hit_type="NO_DAMAGE_EVENT")
 
                 # Go through subsequent events to coalesce RP into this event
-                for next_event in self.events[i + 1 :]:  # noqa
-                    if next_event["timestamp"] - event["timestamp"] > 900:
+                for next_event in lookahead.following(i):
+                    if next_event.timestamp - event.timestamp > 900:
                         break
 
-                    if next_event["runic_power"] != event["runic_power"]:
-                        if next_event["runic_power"] < event["runic_power"]:
+                    if next_event.runic_power != event.runic_power:
+                        if next_event.runic_power < event.runic_power:
                             break
 
                         # We want to get the last change event of the group
-                        event["runic_power"] = next_event["runic_power"]
+                        event.runic_power = next_event.runic_power
 
                 # Coalesce runic_power_waste
-                for next_event in self.events[i + 1 :]:  # noqa
-                    if next_event["timestamp"] - event["timestamp"] > 900:
+                for next_event in lookahead.following(i):
+                    if next_event.timestamp - event.timestamp > 900:
                         break
 
                     if next_event.get("runic_power_waste") and (
                         next_event["abilityGameID"] == event["abilityGameID"]
                         or (
-                            event["ability"] == "Obliterate"
-                            and next_event["ability"] == "Fingers of the Damned"
+                            event.ability_code == OBLITERATE
+                            and next_event.ability_code == FINGERS_OF_THE_DAMNED
                         )
                     ):
                         event["runic_power_waste"] = (
@@ -497,20 +984,25 @@ class Fight:
 
                 # Spells like frost strike don't seem to immediately use the RP
                 if event.get("runic_power_cost", 0) > 0:
-                    for next_event in self.events[i + 1 :]:  # noqa
-                        if next_event["runic_power"] != event["runic_power"]:
-                            if next_event["runic_power"] > event["runic_power"]:
-                                break
-                            event["runic_power"] = next_event["runic_power"]
-                            break
+                    next_event = lookahead.get(i + 1)
+                    if (
+                        next_event is not None
+                        and next_event.runic_power == event.runic_power
+                    ):
+                        change = _next_rp_change(i + 1)
+                        next_event = None if change is None else lookahead.get(change)
+                    if (
+                        next_event is not None
+                        and next_event.runic_power < event.runic_power
+                    ):
+                        event.runic_power = next_event.runic_power
 
                 event.update(
                     runic_power_waste=event.get("runic_power_waste", 0),
                     num_targets=event.get("num_targets", 0),
                     **extra,
                 )
-            events.append(event)
-        return events
+            yield event
 
     def _normalize_time(self, timestamp):
         if timestamp:
@@ -522,67 +1014,66 @@ class Fight:
         frost_type = 21
         unholy_type = 22
 
-        if normalized_event["ability"] == "Obliterate":
+        if normalized_event.ability_code == OBLITERATE:
             frost_type = 22
             unholy_type = 21
 
         return {"frost": frost_type, "unholy": unholy_type}
 
     def _normalize_event(self, event):
-        normalized_event = {**event}
-        normalized_event["timestamp"] = self._normalize_time(event["timestamp"])
+        normalized_event = Event(event)
+        normalized_event.timestamp = self._normalize_time(event["timestamp"])
+        normalized_event.type_code = EVENT_TYPE_CODES.code(event["type"])
+        normalized_event.ability_code = None
+        normalized_event.buff_codes = frozenset()
 
         if "abilityGameID" in event:
-            normalized_event["ability_icon"] = (
-                self._report.get_ability_icon(event["abilityGameID"]),
+            normalized_event.ability_icon = self._report.get_ability_icon_ref(
+                event["abilityGameID"]
             )
-            normalized_event["ability_type"] = self._report.get_ability_type(
+            normalized_event.ability_type = self._report.get_ability_type(
                 event["abilityGameID"]
             )
-            normalized_event["ability"] = self._report.get_ability_name(
+            normalized_event.ability = self._report.get_ability_name(
                 event["abilityGameID"]
             )
+            normalized_event.ability_code = ABILITY_CODES.code(normalized_event.ability)
         if "sourceID" in event:
-            normalized_event["source"] = self._report.get_actor_name(
-                normalized_event["sourceID"]
+            normalized_event.source = self._report.get_actor_name(event["sourceID"])
+            normalized_event.source_is_boss = self._report.get_is_boss_actor(
+                event["sourceID"]
             )
-            normalized_event["source_is_boss"] = self._report.get_is_boss_actor(
-                normalized_event["sourceID"]
-            )
-            normalized_event["source_dies_at"] = self._normalize_time(
+            normalized_event.source_dies_at = self._normalize_time(
                 self._report.get_target_death(
-                    normalized_event["sourceID"],
-                    normalized_event.get("sourceInstance"),
+                    event["sourceID"], event.get("sourceInstance")
                 )
             )
         if "targetID" in event:
-            normalized_event["target"] = self._report.get_actor_name(
-                normalized_event["targetID"]
-            )
-            normalized_event["target_is_boss"] = self._report.get_is_boss_actor(
-                normalized_event["targetID"]
+            normalized_event.target = self._report.get_actor_name(event["targetID"])
+            normalized_event.target_is_boss = self._report.get_is_boss_actor(
+                event["targetID"]
             )
-            normalized_event["target_dies_at"] = self._normalize_time(
+            normalized_event.target_dies_at = self._normalize_time(
                 self._report.get_target_death(
-                    normalized_event["targetID"],
-                    normalized_event.get("targetInstance"),
+                    event["targetID"], event.get("targetInstance")
                 )
             )
         if "hitType" in event:
-            normalized_event["hitType"] = HIT_TYPES[event["hitType"]]
-            normalized_event["is_miss"] = normalized_event["hitType"] in MISS_EVENTS
-            normalized_event["is_crit"] = normalized_event["hitType"] in CRIT_EVENTS
+            hit_type = HIT_TYPES[event["hitType"]]
+            normalized_event.hitType = hit_type
+            normalized_event.is_miss = hit_type in MISS_EVENTS
+            normalized_event.is_crit = hit_type in CRIT_EVENTS
         if event["type"] == "cast":
-            normalized_event["rune_cost"] = {**NO_RUNES}
-            normalized_event["runes_used"] = {**NO_RUNES}
+            normalized_event.rune_cost = {**NO_RUNES}
+            normalized_event.runes_used = {**NO_RUNES}
         if "classResources" in event:
             rune_resource_types = self._get_rune_resource_types(normalized_event)
 
             for resource in event["classResources"]:
                 if resource["type"] == 6:
-                    normalized_event["runic_power"] = resource["amount"]
+                    normalized_event.runic_power = resource["amount"]
                     if resource.get("cost"):
-                        normalized_event["runic_power_cost"] = resource["cost"]
+                        normalized_event.runic_power_cost = resource["cost"]
                 if resource["type"] == 20:
                     normalized_event["rune_cost"]["Blood"] += resource["cost"]
                     normalized_event["runes_used"]["Blood"] += min(
@@ -599,33 +1090,33 @@ class Fight:
                         resource["amount"], resource["cost"]
                     )
             if normalized_event.get("rune_cost") == NO_RUNES:
-                normalized_event["rune_cost"] = None
+                normalized_event.rune_cost = None
 
-        normalized_event["modifies_runes"] = False
-        if normalized_event.get("rune_cost") or normalized_event.get("ability") in (
-            "Blood Tap",
-            "Empower Rune Weapon",
+        normalized_event.modifies_runes = False
+        if normalized_event.get("rune_cost") or normalized_event.ability_code in (
+            BLOOD_TAP,
+            EMPOWER_RUNE_WEAPON,
         ):
-            normalized_event["modifies_runes"] = True
+            normalized_event.modifies_runes = True
 
         if "waste" in event and event["resourceChangeType"] == 6:
-            normalized_event["runic_power_waste"] = event["waste"] * 10
+            normalized_event.runic_power_waste = event["waste"] * 10
 
         if (
-            normalized_event["type"] == "resourcechange"
-            and normalized_event["ability"] == "Anti-Magic Shell"
+            event["type"] == "resourcechange"
+            and normalized_event.ability_code == ANTI_MAGIC_SHELL
         ):
             runic_power_gain = event["resourceChange"] - event["waste"]
-            normalized_event["runic_power_gained_ams"] = runic_power_gain * 10
+            normalized_event.runic_power_gained_ams = runic_power_gain * 10
 
         if "sourceID" in event:
-            normalized_event["is_owner_pet_source"] = self._report.is_owner_pet(
-                normalized_event["sourceID"]
+            normalized_event.is_owner_pet_source = self._report.is_owner_pet(
+                event["sourceID"]
             )
-        normalized_event["is_owner_pet_target"] = False
-        if normalized_event.get("targetID"):
-            normalized_event["is_owner_pet_target"] = self._report.is_owner_pet(
-                normalized_event["targetID"]
+        normalized_event.is_owner_pet_target = False
+        if event.get("targetID"):
+            normalized_event.is_owner_pet_target = self._report.is_owner_pet(
+                event["targetID"]
             )
 
         return normalized_event
@@ -0,0 +1,135 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+RATE_LIMIT_QUERY = "rateLimitData { limitPerHour pointsSpentThisHour pointsResetIn }"
+
+
+class Priority(IntEnum):
+    # Lower value is scheduled first
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class QueryShed(Exception):
+    """Query was dropped because there isn't enough of the WCL point budget left"""
+
+
+class RequestScheduler:
+    """
+    Schedules WCL queries against the hourly point budget, which is tracked
+    from the rateLimitData returned alongside each query.
+    Interactive queries are let through ahead of background ones, and background
+    queries are shed once the remaining budget drops below `background_reserve`
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_concurrency=16,
+        background_reserve=0.1,
+        max_retries=2,
+        retry_backoff=0.25,
+        max_retry_after=5,
+    ):
+        self._max_concurrency = max_concurrency
+        self._background_reserve = background_reserve
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        # Longer Retry-After waits aren't worth holding an interactive request for
+        self._max_retry_after = max_retry_after
+        self._in_flight = 0
+        self._waiting = []
+        self._counter = itertools.count()
+        self._limit_per_hour = None
+        self._points_spent = None
+        self._reset_at = None
+        self.num_shed = 0
+        self.num_retries = 0
+
+    @property
+    def points_remaining(self):
+        if self._limit_per_hour is None or time.monotonic() >= self._reset_at:
+            return None
+        return self._limit_per_hour - self._points_spent
+
+    def _has_budget(self, priority: Priority):
+        points_remaining = self.points_remaining
+        if points_remaining is None:
+            return True
+        if priority == Priority.BACKGROUND:
+            return points_remaining > self._limit_per_hour * self._background_reserve
+        return points_remaining > 0
+
+    def update_rate_limit(self, rate_limit_data):
+        self._limit_per_hour = rate_limit_data["limitPerHour"]
+        self._points_spent = rate_limit_data["pointsSpentThisHour"]
+        self._reset_at = time.monotonic() + rate_limit_data["pointsResetIn"]
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority):
+        if not self._has_budget(priority):
+            self.num_shed += 1
+            raise QueryShed(f"WCL point budget too low for {priority.name} query")
+
+        if self._in_flight >= self._max_concurrency:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiting, (priority, next(self._counter), future))
+            # The slot is handed over by the releasing query, see _release
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        else:
+            self._in_flight += 1
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        while self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def should_retry(self, status, attempt, retry_after=None):
+        return (
+            status in self.RETRY_STATUSES
+            and attempt < self._max_retries
+            and (retry_after is None or retry_after <= self._max_retry_after)
+        )
+
+    async def backoff(self, attempt, retry_after=None):
+        self.num_retries += 1
+        if retry_after is not None:
+            delay = min(retry_after, self._max_retry_after)
+        else:
+            # Full jitter, so concurrent retries don't all land at once
+            delay = random.uniform(0, self._retry_backoff * 2**attempt)
+        await asyncio.sleep(delay)
+
+    def metrics(self):
+        queue_depth = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiting:
+            if not future.done():
+                queue_depth[Priority(priority).name.lower()] += 1
+
+        return {
+            "queue_depth": queue_depth,
+            "in_flight": self._in_flight,
+            "points_remaining": self.points_remaining,
+            "limit_per_hour": self._limit_per_hour,
+            "num_shed": self.num_shed,
+            "num_retries": self.num_retries,
+        }
@@ -0,0 +1,28 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, default=None, indent=False) -> bytes:
+    """
+    Serializes to UTF-8 JSON bytes with orjson if it is installed, falling back to the
+    stdlib. Non-string dict keys are stringified like the stdlib does.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    if indent:
+        return json.dumps(obj, default=default, indent=2).encode()
+    return json.dumps(obj, default=default, separators=(",", ":")).encode()
@@ -0,0 +1,151 @@
+"""
+Checks that Fight._coalesce still produces exactly the same events as the original
+quadratic implementation, over the combat logs saved by the API (see save_combat_log).
+
+Usage, from backend/src:
+    PYTHONPATH=. python ../../tools/check_coalesce.py ../saved_logs
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+from unittest import mock
+
+from report import Fight, Report, Source
+
+
+def reference_coalesce(events):
+    """Fight._coalesce as it was before it was made linear"""
+    coalesced = []
+
+    for i, event in enumerate(events):
+        extra = {}
+
+        if event["type"] == "cast":
+            if event["targetID"] != -1:
+                event["num_targets"] = 1
+                for next_event in events[i + 1 :]:
+                    if (
+                        next_event["type"] == "damage"
+                        and next_event["abilityGameID"] == event["abilityGameID"]
+                        and abs(next_event["timestamp"] - event["timestamp"]) < 100
+                        and next_event.get("sourceInstance")
+                        == event.get("sourceInstance")
+                    ):
+                        if event["targetID"] != next_event["targetID"]:
+                            event["num_targets"] += 1
+                        else:
+                            is_miss = next_event["is_miss"]
+                            hit_type = next_event["hitType"]
+                            extra.update(is_miss=is_miss, hit_type=hit_type)
+                if "is_miss" not in extra:
+                    extra.update(is_miss=False, hit_type="NO_DAMAGE_EVENT")
+
+            for next_event in events[i + 1 :]:
+                if next_event["timestamp"] - event["timestamp"] > 900:
+                    break
+
+                if next_event["runic_power"] != event["runic_power"]:
+                    if next_event["runic_power"] < event["runic_power"]:
+                        break
+                    event["runic_power"] = next_event["runic_power"]
+
+            for next_event in events[i + 1 :]:
+                if next_event["timestamp"] - event["timestamp"] > 900:
+                    break
+
+                if next_event.get("runic_power_waste") and (
+                    next_event["abilityGameID"] == event["abilityGameID"]
+                    or (
+                        event["ability"] == "Obliterate"
+                        and next_event["ability"] == "Fingers of the Damned"
+                    )
+                ):
+                    event["runic_power_waste"] = (
+                        event.get("runic_power_waste", 0)
+                        + next_event["runic_power_waste"]
+                    )
+
+            if event.get("runic_power_cost", 0) > 0:
+                for next_event in events[i + 1 :]:
+                    if next_event["runic_power"] != event["runic_power"]:
+                        if next_event["runic_power"] > event["runic_power"]:
+                            break
+                        event["runic_power"] = next_event["runic_power"]
+                        break
+
+            event.update(
+                runic_power_waste=event.get("runic_power_waste", 0),
+                num_targets=event.get("num_targets", 0),
+                **extra,
+            )
+        coalesced.append(event)
+    return coalesced
+
+
+def load_report(log):
+    metadata = log["metadata"]
+    return Report(
+        Source(metadata["source_id"], metadata["source_name"]),
+        log["events"],
+        [],
+        [],
+        log["combatant_info"],
+        [],
+        list(log["actors"].values()),
+        log["abilities"],
+        list(log["fights"].values()),
+        metadata["end_time"],
+    )
+
+
+def check_log(path):
+    """:return: the number of events that differ from the reference implementation"""
+    with open(path) as f:
+        log = json.load(f)
+
+    num_mismatches = 0
+    coalesce = Fight._coalesce
+
+    def checked_coalesce(fight, events):
+        nonlocal num_mismatches
+
+        events = list(events)
+        expected = reference_coalesce(copy.deepcopy(events))
+        actual = list(coalesce(fight, events))
+        for i, (expected_event, actual_event) in enumerate(zip(expected, actual)):
+            if expected_event != actual_event:
+                num_mismatches += 1
+                print(f"{path.name}: event {i} differs")
+                print(f"  expected: {expected_event}")
+                print(f"  actual:   {actual_event}")
+        num_mismatches += abs(len(expected) - len(actual))
+        yield from actual
+
+    with mock.patch.object(Fight, "_coalesce", checked_coalesce):
+        load_report(log).get_fight(log["metadata"]["fight_id"])
+
+    return num_mismatches
+
+
+def check_coalesce(logs_dir):
+    paths = sorted(Path(logs_dir).glob("*.json"))
+    if not paths:
+        print(f"No saved logs found in {logs_dir}")
+        return False
+
+    failed = 0
+    for path in paths:
+        num_mismatches = check_log(path)
+        if num_mismatches:
+            failed += 1
+        print(f"{path.name}: {'FAIL' if num_mismatches else 'ok'}")
+
+    print(f"{len(paths) - failed}/{len(paths)} logs match")
+    return not failed
+
+
+if __name__ == "__main__":
+    if not check_coalesce(sys.argv[1] if len(sys.argv) > 1 else "../saved_logs"):
+        sys.exit(1)
@@ -0,0 +1,88 @@
+"""
+Checks that the columnar analyzers (see BaseAnalyzer.COLUMNAR) give exactly the same
+analysis as their add_event implementations, over the combat logs saved by the API
+(see save_combat_log).
+
+Usage, from backend/src:
+    PYTHONPATH=. python ../../tools/check_columns.py ../saved_logs
+"""
+
+import json
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+from analysis.analyze import analyze
+from analysis.base import BaseAnalyzer
+from report import Event, Report, Source
+from serialization import dumps
+
+
+def columnar_analyzer_classes(cls=BaseAnalyzer):
+    for subclass in cls.__subclasses__():
+        if subclass.COLUMNAR:
+            yield subclass
+        yield from columnar_analyzer_classes(subclass)
+
+
+def load_report(log):
+    metadata = log["metadata"]
+    return Report(
+        Source(metadata["source_id"], metadata["source_name"]),
+        log["events"],
+        [],
+        [],
+        log["combatant_info"],
+        [],
+        list(log["actors"].values()),
+        log["abilities"],
+        list(log["fights"].values()),
+        metadata["end_time"],
+    )
+
+
+def serialize_analysis(analysis):
+    return dumps(
+        analysis,
+        default=lambda obj: obj.to_dict() if isinstance(obj, Event) else list(obj),
+    )
+
+
+def check_log(path):
+    """:return: whether the analysis is the same with and without the columns"""
+    with open(path) as f:
+        log = json.load(f)
+
+    # Analyses of the same fight are independent, see Report.get_fight
+    report = load_report(log)
+    fight_id = log["metadata"]["fight_id"]
+    columnar = serialize_analysis(analyze(report, fight_id))
+    with ExitStack() as stack:
+        for cls in columnar_analyzer_classes():
+            stack.enter_context(mock.patch.object(cls, "COLUMNAR", False))
+        reference = serialize_analysis(analyze(report, fight_id))
+
+    return columnar == reference
+
+
+def check_columns(logs_dir):
+    paths = sorted(Path(logs_dir).glob("*.json"))
+    if not paths:
+        print(f"No saved logs found in {logs_dir}")
+        return False
+
+    failed = 0
+    for path in paths:
+        matches = check_log(path)
+        if not matches:
+            failed += 1
+        print(f"{path.name}: {'ok' if matches else 'FAIL'}")
+
+    print(f"{len(paths) - failed}/{len(paths)} logs match")
+    return not failed
+
+
+if __name__ == "__main__":
+    if not check_columns(sys.argv[1] if len(sys.argv) > 1 else "../saved_logs"):
+        sys.exit(1)